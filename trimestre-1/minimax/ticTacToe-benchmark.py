@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from ticTacToe_loader import HERE, load_game
+
+# Banco de pruebas reproducible de los dos módulos Minimax: ejecuta get_best_move sobre un
+# conjunto fijo de posiciones (tablero vacío, medio juego y casi al final) y mide el tiempo,
+# los nodos visitados, la memoria máxima y el movimiento devuelto. También mide el tiempo de
+# arranque de los scripts (lanzar un proceso nuevo hasta que la línea de comandos está lista).
+# La referencia tiene dos partes:
+# - Movimientos y nodos (ticTacToe-benchmark.json, en el repositorio): no dependen de la máquina,
+#   así que la comparación falla siempre que cambie algún movimiento (y avisa si cambian los nodos).
+# - Tiempos (ticTacToe-benchmark-times.json, solo local): falla si alguna posición o algún
+#   arranque se vuelve más lento que el umbral indicado respecto a la última referencia guardada
+#   en esta máquina; si no hay, no se comparan.
+#
+# Uso:
+#   python ticTacToe-benchmark.py --save-baseline    # guarda la referencia (movimientos y tiempos)
+#   python ticTacToe-benchmark.py --max-slowdown 1.5 # compara con la referencia
+
+BASELINE_PATH = os.path.join(HERE, "ticTacToe-benchmark.json")      # Movimientos y nodos
+TIMINGS_PATH = os.path.join(HERE, "ticTacToe-benchmark-times.json") # Tiempos de esta máquina
+DEFAULT_REPEATS = 3      # Ejecuciones por posición; se toma el menor tiempo
+DEFAULT_MAX_SLOWDOWN = 1.5 # Cuántas veces más lenta que la referencia puede ser una posición
+MIN_COMPARED_SECONDS = 0.01 # Por debajo de este tiempo el ruido domina y no se compara la velocidad
+
+def minimax_3x3():
+    return load_game("3x3")
+
+def minimax_nxn():
+    return load_game("nxn")
+
+# Posiciones del banco de pruebas: (nombre, módulo, n, k, movimientos, opciones de get_best_move).
+# Los movimientos se juegan alternando X y O desde X; la IA mueve con la marca a la que le toca.
+# Se desactivan la tabla precalculada y el libro de aperturas para medir la búsqueda.
+CORPUS = [
+    ("3x3 vacío",          "3x3", 3, 3, [], {}),
+    ("3x3 medio juego",    "3x3", 3, 3, [(1, 1), (0, 0), (0, 2)], {}),
+    ("3x3 final",          "3x3", 3, 3, [(1, 1), (0, 0), (0, 2), (2, 0), (1, 0), (1, 2)], {}),
+    ("3x3 vacío rápido",   "3x3", 3, 3, [], {"fast": True}),
+    ("3x3 medio rápido",   "3x3", 3, 3, [(1, 1), (0, 0), (0, 2)], {"fast": True}),
+    ("nxn 3x3 vacío",      "nxn", 3, 3, [], {}),
+    ("nxn 3x3 medio juego", "nxn", 3, 3, [(1, 1), (0, 0), (0, 2)], {}),
+    ("nxn 4x4 vacío",      "nxn", 4, 4, [], {"backend": "bitboard"}),
+    ("nxn 4x4 medio juego", "nxn", 4, 4, [(0, 0), (1, 1), (0, 1), (2, 2)], {}),
+    ("nxn 4x4 final",      "nxn", 4, 4, [(0, 0), (1, 1), (0, 1), (2, 2), (3, 3), (0, 2), (0, 3), (3, 0),
+                                         (1, 2), (2, 1)], {}),
+    ("nxn 5x5 vacío",      "nxn", 5, 5, [], {"max_depth": 3}),
+    ("nxn 5x5 medio juego", "nxn", 5, 4, [(2, 2), (1, 1), (2, 1), (2, 3), (1, 2), (3, 1)], {"max_depth": 4}),
+    ("nxn 5x5 final",      "nxn", 5, 5, [(0, 0), (1, 1), (0, 1), (2, 2), (3, 3), (0, 2), (0, 3), (3, 0),
+                                         (1, 2), (2, 1), (4, 4), (0, 4), (4, 0), (1, 3), (3, 2), (2, 0)], {}),
+    ("nxn 10x10 lista",    "nxn", 10, 5, [(4, 4), (5, 5), (4, 5)], {"max_depth": 3}),
+    ("nxn 10x10 numpy",    "nxn", 10, 5, [(4, 4), (5, 5), (4, 5)], {"max_depth": 3, "backend": "numpy"}),
+]
+
+# Arranques medidos: (nombre, argumentos de Python). Con --help cada script carga todo lo que
+# carga al empezar una partida y termina sin jugar. "python vacío" es el mínimo de esta máquina.
+STARTUP_COMMANDS = [
+    ("python vacío",      ["-c", "pass"]),
+    ("3x3 script",        ["ticTacToe-minimax.py", "--help"]),
+    ("nxn script",        ["ticTacToe-n-minimax.py", "--help"]),
+    ("3x3 lanzador",      ["ticTacToe-run.py", "3x3", "--help"]),
+    ("nxn lanzador",      ["ticTacToe-run.py", "nxn", "--help"]),
+]
+
+def measure_startup(repeats=DEFAULT_REPEATS, commands=STARTUP_COMMANDS):
+    # Menor tiempo de 'repeats' arranques de cada orden, en un proceso nuevo cada vez
+    results = []
+    print(f"{'Arranque':<22} {'Segundos':>9}")
+    for name, arguments in commands:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *arguments], cwd=HERE, stdout=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start)
+        results.append({"name": name, "seconds": min(times)})
+        print(f"{name:<22} {min(times):>9.4f}")
+    return results
+
+def build_position(engine, n, k, moves, backend):
+    # Devuelve (módulo, tablero, marca de la IA, marca del oponente) con los movimientos jugados
+    module = minimax_3x3() if engine == "3x3" else minimax_nxn()
+    board = module.TicTacBoard() if engine == "3x3" else module.BOARD_BACKENDS[backend](n, k=k)
+    mark = module.PLAYER_X
+    for move in moves:
+        board.make_move(move, mark)
+        mark = module.PLAYER_O if mark == module.PLAYER_X else module.PLAYER_X
+    if board.get_state() != module.State.PLAYING:
+        raise ValueError(f"La posición {moves} ya ha terminado.")
+    opponent = module.PLAYER_O if mark == module.PLAYER_X else module.PLAYER_X
+    return module, board, mark, opponent
+
+def search_once(engine, n, k, moves, options):
+    # Busca el movimiento desde un tablero recién creado (tabla de transposición vacía)
+    # y devuelve (movimiento, nodos, segundos)
+    options = dict(options)
+    module, board, mark, opponent = build_position(engine, n, k, moves, options.pop("backend", "list"))
+    stats = module.SearchStats()
+    if engine == "3x3":
+        move = module.get_best_move(board, mark, opponent, module.evaluate_board, stats=stats, use_table=False, **options)
+    else:
+        move = module.get_best_move(board, mark, stats=stats, use_book=False, **options)
+    return move, stats.nodes, stats.elapsed
+
+def run_case(case, repeats=DEFAULT_REPEATS):
+    # Mide una posición: menor tiempo de 'repeats' ejecuciones y memoria máxima en una ejecución
+    # aparte (tracemalloc ralentiza la búsqueda, así que no se mide a la vez que el tiempo)
+    name, engine, n, k, moves, options = case
+    times = []
+    for _ in range(repeats):
+        move, nodes, elapsed = search_once(engine, n, k, moves, options)
+        times.append(elapsed)
+    tracemalloc.start()
+    search_once(engine, n, k, moves, options)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"name": name, "move": list(move) if move is not None else None, "nodes": nodes,
+            "seconds": min(times), "peak_kib": peak / 1024}
+
+def run_benchmark(repeats=DEFAULT_REPEATS, corpus=CORPUS):
+    results = []
+    print(f"{'Posición':<22} {'Movimiento':>10} {'Nodos':>9} {'Segundos':>9} {'Nodos/s':>9} {'Memoria KiB':>12}")
+    for case in corpus:
+        backend = case[5].get("backend", "list")
+        if case[1] == "nxn" and backend not in minimax_nxn().BOARD_BACKENDS:
+            print(f"{case[0]:<22} omitida: el tablero '{backend}' no está disponible (¿falta NumPy?)")
+            continue
+        result = run_case(case, repeats)
+        results.append(result)
+        rate = result["nodes"] / result["seconds"] if result["seconds"] > 0 else 0
+        print(f"{result['name']:<22} {str(tuple(result['move'])):>10} {result['nodes']:>9} {result['seconds']:>9.4f} "
+              f"{rate:>9.0f} {result['peak_kib']:>12.1f}")
+    return results
+
+def compare_speed(current, reference, max_slowdown, label):
+    # Fallos de velocidad: entradas que tardan más de max_slowdown veces lo que tardaban en la
+    # referencia (si alguna de las dos ejecuciones tarda al menos MIN_COMPARED_SECONDS)
+    reference = {result["name"]: result for result in reference}
+    failures = []
+    for result in current:
+        old = reference.get(result["name"])
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] > 0 else 1.0
+        if ratio > max_slowdown and max(result["seconds"], old["seconds"]) >= MIN_COMPARED_SECONDS:
+            failures.append(f"{label}{result['name']}: {ratio:.2f} veces más lenta ({old['seconds']:.4f} s -> {result['seconds']:.4f} s)")
+    return failures
+
+def compare(results, baseline, max_slowdown=DEFAULT_MAX_SLOWDOWN, startup=(), timings=None):
+    # Devuelve la lista de fallos respecto a la referencia: movimientos distintos (baseline) y,
+    # si se dan los tiempos de referencia de esta máquina (timings), posiciones o arranques más
+    # lentos que max_slowdown veces lo que tardaban
+    reference = {result["name"]: result for result in baseline["results"]}
+    failures = []
+    for result in results:
+        old = reference.get(result["name"])
+        if old is None:
+            continue
+        if result["move"] != old["move"]:
+            failures.append(f"{result['name']}: movimiento {result['move']} en lugar de {old['move']}")
+        if result["nodes"] != old["nodes"]:
+            print(f"Aviso: {result['name']}: {result['nodes']} nodos en lugar de {old['nodes']}")
+    if timings is not None:
+        failures += compare_speed(results, timings["results"], max_slowdown, "")
+        failures += compare_speed(startup, timings.get("startup", []), max_slowdown, "arranque ")
+    return failures
+
+def save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+def load_json(path):
+    # Devuelve el contenido del fichero, o None si no existe
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas de los módulos Minimax")
+    parser.add_argument("--baseline", default=BASELINE_PATH, metavar="RUTA",
+                        help="fichero JSON con los movimientos y nodos de referencia")
+    parser.add_argument("--timings", default=TIMINGS_PATH, metavar="RUTA",
+                        help="fichero JSON con los tiempos de referencia de esta máquina")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guarda esta ejecución como referencia en lugar de compararla")
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help="cuántas veces más lenta que la referencia puede ser una posición")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="ejecuciones por posición (se toma el menor tiempo)")
+    parser.add_argument("--output", metavar="RUTA", help="escribe también los resultados en RUTA (JSON)")
+    parser.add_argument("--no-startup", dest="startup", action="store_false",
+                        help="no mide el tiempo de arranque de los scripts")
+    args = parser.parse_args()
+
+    startup = measure_startup(args.repeats) if args.startup else []
+    results = run_benchmark(args.repeats)
+    report = {"python": sys.version.split()[0], "date": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results,
+              "startup": startup}
+    if args.output:
+        save_json(args.output, report)
+    baseline = load_json(args.baseline)
+    timings = load_json(args.timings)
+    if args.save_baseline:
+        # Se conservan las posiciones de la referencia que no se han medido (p. ej. sin NumPy)
+        moves = {result["name"]: {"name": result["name"], "move": result["move"], "nodes": result["nodes"]}
+                 for result in (baseline or {"results": []})["results"]}
+        moves.update((result["name"], {"name": result["name"], "move": result["move"], "nodes": result["nodes"]})
+                     for result in results)
+        save_json(args.baseline, {"results": list(moves.values())})
+        save_json(args.timings, report)
+        print(f"Referencia guardada en {args.baseline} (movimientos) y {args.timings} (tiempos)")
+        return 0
+    if baseline is None:
+        print(f"No hay referencia en {args.baseline}; usa --save-baseline para crearla.")
+        return 0
+    if timings is None:
+        print(f"No hay tiempos de referencia en {args.timings}: solo se comparan los movimientos.")
+    failures = compare(results, baseline, args.max_slowdown, startup, timings)
+    for failure in failures:
+        print(f"FALLO: {failure}")
+    if not failures:
+        since = f" (tiempos del {timings['date']})" if timings is not None else ""
+        print(f"Sin cambios respecto a la referencia{since}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
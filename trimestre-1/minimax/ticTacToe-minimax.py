@@ -1,22 +1,117 @@
+import argparse
+import json
 import math
+import mmap
+import os
+import random
+import time
 
 # Constantes
 PLAYER_X = 'X'  # Define la marca para el jugador X
 PLAYER_O = 'O'  # Define la marca para el jugador O
 
+# Líneas ganadoras del tablero 3x3 (filas, columnas y diagonales) como listas de casillas
+WIN_LINES = [[(r, c) for c in range(3)] for r in range(3)] + \
+            [[(r, c) for r in range(3)] for c in range(3)] + \
+            [[(0, 0), (1, 1), (2, 2)], [(0, 2), (1, 1), (2, 0)]]
+
+NULL_WINDOW = 1e-6 # Anchura de la ventana nula usada por la búsqueda de variante principal (PVS)
+
+# Hashing Zobrist: un número aleatorio de 64 bits por cada (casilla, marca), generado con una
+# semilla fija. La clave de una posición es el XOR de los de sus casillas ocupadas.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST = {(r, c): {PLAYER_X: _zobrist_rng.getrandbits(64), PLAYER_O: _zobrist_rng.getrandbits(64)}
+           for r in range(3) for c in range(3)}
+ZOBRIST_TURN = {PLAYER_X: _zobrist_rng.getrandbits(64), PLAYER_O: _zobrist_rng.getrandbits(64)}      # A quién le toca mover
+ZOBRIST_MAXIMIZER = {PLAYER_X: _zobrist_rng.getrandbits(64), PLAYER_O: _zobrist_rng.getrandbits(64)} # Quién maximiza
+DEFAULT_TT_ENTRIES = 1 << 14 # Entradas de la tabla de transposición (hay 5478 posiciones legales en 3x3)
+
 # Define los posibles estados del juego
 class State:
     DRAW    = "DRAW"    # Estado de empate
     OVER    = "OVER"    # Estado de juego terminado (alguien ganó)
     PLAYING = "PLAYING" # Estado de juego en curso
 
+# Tipo de puntuación guardada en la tabla de transposición
+class Bound:
+    EXACT = "EXACT" # Puntuación exacta
+    LOWER = "LOWER" # Cota inferior (la búsqueda se cortó por beta)
+    UPPER = "UPPER" # Cota superior (ningún movimiento superó a alpha)
+
+# Tabla de transposición de tamaño fijo: guarda el resultado de posiciones ya buscadas para no
+# repetir la búsqueda cuando se llega a ellas por otro orden de movimientos.
+# Cada entrada es una tupla (clave, puntuación, tipo de cota, profundidad, mejor movimiento).
+# Políticas de reemplazo cuando dos posiciones caen en la misma casilla de la tabla:
+# - "depth": se conserva la entrada buscada a más profundidad.
+# - "two-tier": dos entradas por casilla, una que prefiere profundidad y otra que siempre se reemplaza.
+class TranspositionTable:
+    POLICIES = ("depth", "two-tier")
+
+    def __init__(self, max_entries=DEFAULT_TT_ENTRIES, policy="depth"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de reemplazo desconocida: {policy}. Usa una de {self.POLICIES}.")
+        if max_entries < 2:
+            raise ValueError("La tabla de transposición debe tener al menos 2 entradas.")
+        self.policy = policy
+        self.max_entries = max_entries
+        self.buckets = max_entries // 2 if policy == "two-tier" else max_entries
+        self.entries = [None] * (self.buckets * 2 if policy == "two-tier" else self.buckets)
+        self.probes = 0 # Consultas realizadas
+        self.hits = 0   # Consultas que encontraron la posición
+
+    def __len__(self):
+        # Número de entradas ocupadas
+        return sum(1 for entry in self.entries if entry is not None)
+
+    def clear(self):
+        self.entries = [None] * len(self.entries)
+
+    def probe(self, key):
+        # Devuelve la entrada guardada para 'key', o None si no está
+        self.probes += 1
+        if self.policy == "two-tier":
+            index = (key % self.buckets) * 2
+            candidates = (self.entries[index], self.entries[index + 1])
+        else:
+            candidates = (self.entries[key % self.buckets],)
+        for entry in candidates:
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        return None
+
+    def store(self, key, score, bound, depth, best_move):
+        # Guarda el resultado de una búsqueda respetando la política de reemplazo
+        new_entry = (key, score, bound, depth, best_move)
+        if self.policy == "two-tier":
+            index = (key % self.buckets) * 2
+            deep = self.entries[index]
+            if deep is None or deep[0] == key or depth >= deep[3]:
+                if deep is not None and deep[0] != key:
+                    self.entries[index + 1] = deep # La entrada desplazada pasa a la parte de reemplazo siempre
+                self.entries[index] = new_entry
+            else:
+                self.entries[index + 1] = new_entry
+            return
+        index = key % self.buckets
+        old = self.entries[index]
+        if old is None or old[0] == key or depth >= old[3]:
+            self.entries[index] = new_entry
+
 # Representa el tablero y la lógica del juego Tres en Raya
 class TicTacBoard:
-    def __init__(self):
+    # Atributos fijos: el acceso es algo más rápido y cada tablero ocupa menos memoria
+    __slots__ = ("board", "winner", "moves_history", "empty_count", "zobrist_key", "tt", "tt_eval_func")
+
+    def __init__(self, tt_max_entries=DEFAULT_TT_ENTRIES, tt_policy="depth"):
         # Inicializa el tablero como una cuadrícula de 3x3 vacía
         self.board = [[' ' for _ in range(3)] for _ in range(3)]
+        self.empty_count = 9 # Casillas vacías, actualizado en make_move/undo
         self.winner = None  # Almacena quién ganó (PLAYER_X o PLAYER_O), o None si nadie ha ganado aún
         self.moves_history = [] # Guarda el historial de movimientos (coordenadas)
+        self.zobrist_key = 0 # Clave Zobrist de la posición, actualizada en make_move/undo
+        self.tt = TranspositionTable(tt_max_entries, tt_policy) # Tabla de transposición de la partida
+        self.tt_eval_func = None # Función de evaluación con la que se llenó la tabla
 
     def print_board(self):
         # Imprime el estado actual del tablero en la consola
@@ -39,7 +134,9 @@ class TicTacBoard:
         r, c = move
         if self.board[r][c] == ' ': # Si la casilla está vacía
             self.board[r][c] = mark # Coloca la marca del jugador
+            self.zobrist_key ^= ZOBRIST[move][mark] # Actualiza la clave de la posición
             self.moves_history.append(move) # Registra el movimiento
+            self.empty_count -= 1
             self._check_win() # Verifica si este movimiento resultó en una victoria
         else:
             # Este error no debería ocurrir si se usa get_possible_moves() correctamente
@@ -52,7 +149,9 @@ class TicTacBoard:
             return
         last_move = self.moves_history.pop() # Obtiene y elimina el último movimiento del historial
         r, c = last_move
+        self.zobrist_key ^= ZOBRIST[last_move][self.board[r][c]] # Quita la marca de la clave
         self.board[r][c] = ' ' # Limpia la casilla en el tablero
+        self.empty_count += 1
         self.winner = None # Anula cualquier ganador, ya que el estado del juego cambió
 
     def _check_win(self):
@@ -87,7 +186,7 @@ class TicTacBoard:
         # Devuelve el estado actual del juego
         if self.winner: # Si hay un ganador
             return State.OVER # El juego terminó
-        if not self.get_possible_moves(): # Si no hay ganador Y no quedan movimientos posibles
+        if not self.empty_count: # Si no hay ganador Y no quedan movimientos posibles
             return State.DRAW # Es un empate
         return State.PLAYING # De lo contrario, el juego sigue en curso
 
@@ -172,22 +271,432 @@ def minimax(board, is_maximizing_turn, maximizer_mark, opponent_mark, depth, eva
 
         return best_score, best_move_at_this_level
 
-def get_best_move(board, ai_mark, opponent_mark, eval_func):
+# Contadores de una búsqueda, para poder comparar el coste de los distintos algoritmos.
+# Se pasan opcionalmente a get_best_move o minimax_alpha_beta; sin ellos la búsqueda no cuenta nada.
+# Los contadores se acumulan si se reutilizan en varias búsquedas.
+# on_root_move: función (movimiento, puntuación, stats) que se llama tras buscar cada movimiento de
+#               la raíz (la puntuación puede ser solo una cota si se descartó con la ventana nula)
+# trace: si es True se guarda también cada movimiento de la raíz en 'events', para dump_json
+class SearchStats:
+    def __init__(self, on_root_move=None, trace=False):
+        self.nodes = 0           # Nodos visitados (llamadas recursivas)
+        self.evaluations = 0     # Posiciones terminales evaluadas con eval_func
+        self.tt_hits = 0         # Consultas a la tabla de transposición que encontraron la posición
+        self.tt_cutoffs = 0      # Nodos resueltos directamente con la tabla de transposición
+        self.cutoffs = 0         # Podas alfa-beta (el resto de movimientos del nodo no se buscó)
+        self.table_hits = 0      # Movimientos respondidos con la tabla precalculada
+        self.nodes_by_depth = [] # Nodos visitados a cada profundidad (la raíz es la 0)
+        self.elapsed = 0.0       # Segundos empleados en get_best_move
+        self.on_root_move = on_root_move
+        self.trace = trace
+        self.events = []
+        self._start = time.perf_counter()
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def root_move(self, move, score):
+        # Lo llama minimax_alpha_beta tras buscar un movimiento de la raíz
+        if self.trace:
+            self.events.append({"event": "root_move", "move": list(move), "score": score, "nodes": self.nodes})
+        if self.on_root_move is not None:
+            self.on_root_move(move, score, self)
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self.elapsed += time.perf_counter() - self._start
+
+    def to_dict(self):
+        return {"nodes": self.nodes, "evaluations": self.evaluations, "tt_hits": self.tt_hits,
+                "tt_cutoffs": self.tt_cutoffs, "cutoffs": self.cutoffs, "table_hits": self.table_hits,
+                "nodes_by_depth": self.nodes_by_depth, "elapsed_ms": self.elapsed * 1000,
+                "nodes_per_second": self.nodes_per_second}
+
+    def dump_json(self, path):
+        # Escribe los contadores y, si se activó trace, los eventos en un fichero JSON
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.to_dict(), events=self.events), f, indent=2)
+
+    def __str__(self):
+        text = f"{self.nodes} nodos"
+        if self.elapsed > 0:
+            text += f", {self.nodes_per_second:.0f} nodos/s"
+        return text
+
+def order_moves(board, moves, mark, opponent_mark, first_move=None):
+    # Ordena los movimientos para que la poda Alfa-Beta corte cuanto antes:
+    # primero las victorias inmediatas, después los bloqueos, después las casillas que
+    # pasan por más líneas abiertas y, a igualdad, el centro antes que las esquinas y los lados.
+    # first_move: movimiento que se prueba antes que ninguno (p. ej. el de la tabla de transposición)
+    def priority(move):
+        score = 0
+        for line in WIN_LINES:
+            if move not in line:
+                continue
+            own = sum(1 for r, c in line if board.board[r][c] == mark)
+            opponent = sum(1 for r, c in line if board.board[r][c] == opponent_mark)
+            if opponent == 0:
+                score += 100000 if own == 2 else 1 + own * own # Victoria inmediata o línea propia abierta
+            elif own == 0:
+                score += 10000 if opponent == 2 else opponent * opponent # Bloqueo o línea del oponente
+        distance = abs(move[0] - 1) + abs(move[1] - 1)
+        return (score, -distance)
+
+    ordered = sorted(moves, key=priority, reverse=True)
+    if first_move in ordered:
+        ordered.remove(first_move)
+        ordered.insert(0, first_move)
+    return ordered
+
+'''
+    --- Algoritmo Minimax con poda Alfa-Beta ---
+    Misma firma que minimax (más la ventana alpha/beta) y mismo resultado, pero descarta
+    las ramas que no pueden cambiar la decisión:
+    - alpha es la mejor puntuación ya garantizada para el maximizador y beta la del minimizador;
+      cuando alpha >= beta el resto de movimientos del nodo se poda.
+    - Por debajo de la raíz los movimientos se ordenan con order_moves; en la raíz se mantiene
+      el orden natural para que, ante empates, se elija el mismo movimiento que minimax.
+    - Búsqueda de variante principal (PVS): el primer movimiento se busca con la ventana completa
+      y el resto con una ventana nula; solo si mejoran se vuelven a buscar con la ventana completa.
+    - Tabla de transposición (board.tt): las posiciones ya buscadas se reutilizan aunque se llegue
+      a ellas por otro orden de movimientos. Como eval_func puede no ser simétrica, la clave
+      incluye quién mueve y quién maximiza, y la tabla se vacía al buscar con otra eval_func
+      que la de la búsqueda anterior. En la raíz no se usa para cortar, para no alterar
+      el desempate entre movimientos con la misma puntuación.
+'''
+def minimax_alpha_beta(board, is_maximizing_turn, maximizer_mark, opponent_mark, depth, eval_func,
+                       alpha=-math.inf, beta=math.inf, stats=None):
+    # Los parámetros son los de minimax, más:
+    # alpha, beta: ventana de búsqueda actual
+    # stats: SearchStats opcional donde se acumula el número de nodos visitados
+    if stats is not None:
+        stats.nodes += 1
+        if depth < len(stats.nodes_by_depth):
+            stats.nodes_by_depth[depth] += 1
+        else:
+            stats.nodes_by_depth.append(1)
+
+    current_state = board.get_state()
+    if current_state == State.DRAW or current_state == State.OVER:
+        if stats is not None:
+            stats.evaluations += 1
+        return eval_func(board, maximizer_mark), None
+
+    mark = maximizer_mark if is_maximizing_turn else opponent_mark
+    other_mark = opponent_mark if is_maximizing_turn else maximizer_mark
+
+    possible_moves = board.get_possible_moves()
+    empty_squares = len(possible_moves) # Profundidad que se busca por debajo de esta posición
+
+    if depth == 0 and board.tt_eval_func is not eval_func:
+        # Las puntuaciones guardadas son de otra función de evaluación: no sirven
+        board.tt.clear()
+        board.tt_eval_func = eval_func
+    tt_key = board.zobrist_key ^ ZOBRIST_TURN[mark] ^ ZOBRIST_MAXIMIZER[maximizer_mark]
+    tt_move = None
+    if depth > 0:
+        entry = board.tt.probe(tt_key)
+        if entry is not None:
+            if stats is not None:
+                stats.tt_hits += 1
+            _, stored_score, bound, stored_depth, tt_move = entry
+            if stored_depth >= empty_squares:
+                if bound == Bound.LOWER:
+                    alpha = max(alpha, stored_score)
+                elif bound == Bound.UPPER:
+                    beta = min(beta, stored_score)
+                if bound == Bound.EXACT or alpha >= beta:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return stored_score, tt_move
+        possible_moves = order_moves(board, possible_moves, mark, other_mark, tt_move)
+    alpha_start, beta_start = alpha, beta # Ventana realmente buscada, para clasificar el resultado
+
+    best_move_at_this_level = None
+
+    if is_maximizing_turn: # Turno de la IA (quiere la puntuación más alta)
+        best_score = -math.inf
+        for index, move in enumerate(possible_moves):
+            board.make_move(move, mark)
+            if index == 0:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, opponent_mark, depth + 1, eval_func, alpha, beta, stats)
+            else:
+                # Ventana nula: solo interesa saber si este movimiento supera a alpha
+                score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, opponent_mark, depth + 1, eval_func, alpha, alpha + NULL_WINDOW, stats)
+                if alpha < score_of_resulting_state < beta:
+                    score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, opponent_mark, depth + 1, eval_func, alpha, beta, stats)
+            board.undo()
+            if depth == 0 and stats is not None:
+                stats.root_move(move, score_of_resulting_state)
+
+            if score_of_resulting_state > best_score:
+                best_score = score_of_resulting_state
+                best_move_at_this_level = move
+            alpha = max(alpha, best_score)
+            if alpha >= beta: # Poda: el minimizador nunca permitirá llegar a este nodo
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+        _store_result(board, tt_key, best_score, alpha_start, beta_start, empty_squares, best_move_at_this_level)
+        return best_score, best_move_at_this_level
+
+    else: # Turno del oponente (quiere la puntuación más baja para la IA)
+        best_score = math.inf
+        for index, move in enumerate(possible_moves):
+            board.make_move(move, mark)
+            if index == 0:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, opponent_mark, depth + 1, eval_func, alpha, beta, stats)
+            else:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, opponent_mark, depth + 1, eval_func, beta - NULL_WINDOW, beta, stats)
+                if alpha < score_of_resulting_state < beta:
+                    score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, opponent_mark, depth + 1, eval_func, alpha, beta, stats)
+            board.undo()
+            if depth == 0 and stats is not None:
+                stats.root_move(move, score_of_resulting_state)
+
+            if score_of_resulting_state < best_score:
+                best_score = score_of_resulting_state
+                best_move_at_this_level = move
+            beta = min(beta, best_score)
+            if alpha >= beta: # Poda: el maximizador nunca permitirá llegar a este nodo
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+        _store_result(board, tt_key, best_score, alpha_start, beta_start, empty_squares, best_move_at_this_level)
+        return best_score, best_move_at_this_level
+
+def _store_result(board, tt_key, score, alpha, beta, depth, best_move):
+    # Guarda en la tabla de transposición el resultado de un nodo buscado con la ventana [alpha, beta]
+    if score <= alpha:
+        bound = Bound.UPPER # Ningún movimiento superó a alpha: la puntuación real puede ser menor
+    elif score >= beta:
+        bound = Bound.LOWER # Se podó por beta: la puntuación real puede ser mayor
+    else:
+        bound = Bound.EXACT
+    board.tt.store(tt_key, score, bound, depth, best_move)
+
+# --- Búsqueda rápida sin asignaciones ---
+# Versión del minimax con poda Alfa-Beta pensada para resolver el 3x3 completo lo más rápido
+# posible en Python puro. Frente a minimax_alpha_beta:
+# - Trabaja sobre una copia plana del tablero (9 casillas) que se hace una sola vez por búsqueda;
+#   en cada nodo solo se escribe y se borra una casilla.
+# - Las casillas vacías están en una única lista preasignada: las 'count' primeras son las
+#   vacías del nodo actual. Para bajar un nivel, la casilla jugada se intercambia con la última
+#   y el hijo usa una menos; al volver se deshace el intercambio. No se crea ninguna lista.
+# - La victoria se comprueba solo en las líneas de la casilla jugada (pares precalculados) y
+#   el empate con el número de casillas vacías, sin llamar a get_state ni a evaluate_board.
+# - Es un negamax: devuelve un único número (1 gana, 0 empata, -1 pierde, para quien mueve),
+#   sin tuplas (puntuación, movimiento). Solo la raíz devuelve el movimiento.
+# Da el mismo resultado que minimax con evaluate_board, incluido el desempate por orden natural.
+
+# Para cada casilla (r * 3 + c), las otras dos casillas de cada línea que pasa por ella
+WIN_PAIRS = [tuple(tuple(r * 3 + c for r, c in line if r * 3 + c != cell) for line in WIN_LINES if divmod(cell, 3) in line)
+             for cell in range(9)]
+
+FAST_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7) # Centro, esquinas y lados
+
+def _negamax(cells, empties, count, mark, other, alpha, beta, stats):
+    # Valor de la posición para 'mark', que es quien mueve, con las 'count' primeras casillas de
+    # 'empties' vacías. Cuenta como nodo cada posición visitada, también las terminales.
+    stats.nodes += 1
+    best = -2
+    last = count - 1
+    win_pairs = WIN_PAIRS
+    for i in range(count):
+        cell = empties[i]
+        cells[cell] = mark
+        for a, b in win_pairs[cell]:
+            if cells[a] == mark and cells[b] == mark:
+                value = 1 # Gana con este movimiento
+                stats.nodes += 1
+                break
+        else:
+            if last == 0:
+                value = 0 # Tablero lleno: empate
+                stats.nodes += 1
+            else:
+                empties[i] = empties[last]
+                empties[last] = cell
+                value = -_negamax(cells, empties, last, other, mark, -beta, -alpha, stats)
+                empties[last] = empties[i]
+                empties[i] = cell
+        cells[cell] = ' '
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+    return best
+
+def minimax_fast(board, maximizer_mark, opponent_mark, stats=None):
+    # Devuelve (puntuación, movimiento) como minimax(board, True, maximizer_mark, opponent_mark, 0,
+    # evaluate_board), es decir, con la IA ('maximizer_mark') como jugador al que le toca mover
+    if stats is None:
+        stats = SearchStats()
+    if board.get_state() != State.PLAYING:
+        stats.nodes += 1
+        return evaluate_board(board, maximizer_mark), None
+    cells = [board.board[cell // 3][cell % 3] for cell in range(9)]
+    # Por debajo de la raíz las casillas se prueban en el orden de FAST_ORDER (con los cambios
+    # que introducen los intercambios), que poda bastante más que el orden natural
+    empties = [cell for cell in FAST_ORDER if cells[cell] == ' ']
+    count = len(empties)
+    stats.nodes += 1
+    best_score, best_cell = -2, None
+    # En la raíz se recorren los movimientos en orden natural y cada uno se busca con la ventana
+    # (mejor puntuación, 1]: si no la supera no puede sustituir al mejor, así que basta una cota
+    for cell in sorted(empties):
+        i = empties.index(cell)
+        cells[cell] = maximizer_mark
+        if any(cells[a] == maximizer_mark and cells[b] == maximizer_mark for a, b in WIN_PAIRS[cell]):
+            value = 1
+            stats.nodes += 1
+        elif count == 1:
+            value = 0
+            stats.nodes += 1
+        else:
+            empties[i] = empties[-1]
+            empties[-1] = cell
+            value = -_negamax(cells, empties, count - 1, opponent_mark, maximizer_mark, -1, -best_score, stats)
+            empties[-1] = empties[i]
+            empties[i] = cell
+        cells[cell] = ' '
+        if value > best_score:
+            best_score, best_cell = value, cell
+            if value == 1: # No se puede mejorar una victoria
+                break
+    return best_score, divmod(best_cell, 3)
+
+# --- Tabla precalculada de 3x3 ---
+# Fichero binario con la jugada perfecta de cada posición alcanzable: un byte por (posición, turno).
+# El índice de una posición es su codificación en base 3 (casilla r*3+c: 0 vacía, 1 X, 2 O)
+# multiplicada por 2, más 1 si le toca mover a O. Cada byte guarda en los 4 bits bajos la casilla del
+# mejor movimiento y en los bits 4-5 el valor para quien mueve (1 pierde, 2 empata, 3 gana).
+# Un 0 indica que la posición no tiene entrada (terminada o imposible).
+SOLVED_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ticTacToe-3x3.table")
+SOLVED_TABLE_SIZE = 3 ** 9 * 2
+CELL_CODES = {' ': 0, PLAYER_X: 1, PLAYER_O: 2}
+_solved_table = None         # Tabla mapeada en memoria, se carga la primera vez que se necesita
+_solved_table_loaded = False # Evita reintentar la carga si el fichero no existe
+
+def position_index(board, mark):
+    # Índice de la posición en la tabla precalculada, con 'mark' como jugador al que le toca mover
+    index = 0
+    for cell in range(8, -1, -1):
+        index = index * 3 + CELL_CODES[board.board[cell // 3][cell % 3]]
+    return index * 2 + (CELL_CODES[mark] - 1)
+
+def solve_all_positions():
+    # Resuelve todas las posiciones alcanzables (empiece quien empiece) y devuelve la tabla como bytearray.
+    # En caso de empate entre movimientos se elige el primero en orden natural, igual que minimax.
+    table = bytearray(SOLVED_TABLE_SIZE)
+    lines = [[r * 3 + c for r, c in line] for line in WIN_LINES]
+    lines_by_cell = [[line for line in lines if cell in line] for cell in range(9)]
+    powers = [3 ** cell for cell in range(9)]
+    cells = [0] * 9
+
+    def solve(index, code, empties):
+        # Devuelve el valor de la posición para el jugador 'code' (1 X, 2 O), que es quien mueve
+        slot = index * 2 + (code - 1)
+        if table[slot]: # Ya resuelta por otro orden de movimientos
+            return (table[slot] >> 4) - 2
+        best_value, best_cell = -2, None
+        for cell in range(9):
+            if cells[cell]:
+                continue
+            cells[cell] = code
+            if any(all(cells[i] == code for i in line) for line in lines_by_cell[cell]):
+                value = 1 # Gana con este movimiento
+            elif empties == 1:
+                value = 0 # Tablero lleno: empate
+            else:
+                value = -solve(index + code * powers[cell], 3 - code, empties - 1)
+            cells[cell] = 0
+            if value > best_value:
+                best_value, best_cell = value, cell
+        table[slot] = ((best_value + 2) << 4) | best_cell
+        return best_value
+
+    solve(0, 1, 9) # Empieza X
+    solve(0, 2, 9) # Empieza O
+    return table
+
+def build_solved_table(path=SOLVED_TABLE_PATH):
+    # Resuelve el juego y escribe la tabla en 'path'
+    table = solve_all_positions()
+    with open(path, "wb") as f:
+        f.write(table)
+    return sum(1 for entry in table if entry)
+
+def load_solved_table(path=SOLVED_TABLE_PATH):
+    # Mapea la tabla en memoria la primera vez que se llama. Devuelve None si no está disponible.
+    global _solved_table, _solved_table_loaded
+    if not _solved_table_loaded:
+        _solved_table_loaded = True
+        try:
+            with open(path, "rb") as f:
+                table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError): # El fichero no existe o está vacío
+            return None
+        if len(table) != SOLVED_TABLE_SIZE:
+            table.close()
+            return None
+        _solved_table = table
+    return _solved_table
+
+def lookup_solved_move(board, mark):
+    # Devuelve (movimiento, valor para 'mark') de la tabla precalculada, o None si no hay entrada
+    table = load_solved_table()
+    if table is None:
+        return None
+    entry = table[position_index(board, mark)]
+    if not entry:
+        return None
+    cell = entry & 0x0F
+    return (cell // 3, cell % 3), (entry >> 4) - 2
+
+def get_best_move(board, ai_mark, opponent_mark, eval_func, use_alpha_beta=True, stats=None, use_table=True, fast=False):
     # Encuentra el mejor movimiento para la IA en el estado actual del tablero
     # ai_mark: la marca de la IA
     # opponent_mark: la marca del oponente
     # eval_func: la función para evaluar el tablero
+    # use_alpha_beta: si es False se usa el minimax completo original
+    # stats: SearchStats opcional para obtener los contadores y el tiempo de la búsqueda
+    # use_table: consulta primero la tabla precalculada (solo tiene sentido con evaluate_board)
+    # fast: busca con minimax_fast en lugar de minimax_alpha_beta (solo con evaluate_board)
+    if stats is not None:
+        stats.start()
+
+    entry = lookup_solved_move(board, ai_mark) if use_table and eval_func is evaluate_board else None
 
     # La primera llamada a minimax es para el turno de la IA (is_maximizing_turn = True), en profundidad 0.
     # minimax ahora devuelve (puntuación, movimiento_que_lleva_a_esa_puntuación_desde_este_nivel).
     # Desempaquetar la puntuación y el movimiento. Solo necesitamos el movimiento.
-    _, best_move = minimax(board, True, ai_mark, opponent_mark, 0, eval_func)
-        
+    if entry is not None:
+        best_move = entry[0]
+        if stats is not None:
+            stats.table_hits += 1
+    elif fast and eval_func is evaluate_board:
+        _, best_move = minimax_fast(board, ai_mark, opponent_mark, stats)
+    elif use_alpha_beta:
+        _, best_move = minimax_alpha_beta(board, True, ai_mark, opponent_mark, 0, eval_func, stats=stats)
+    else:
+        _, best_move = minimax(board, True, ai_mark, opponent_mark, 0, eval_func)
+
+    if stats is not None:
+        stats.stop()
     return best_move
 
-def play_game():
+def play_game(trace_path=None):
     # Función principal que maneja el flujo de una partida
+    # trace_path: si se indica, tras cada movimiento de la IA se escriben ahí en JSON los
+    #             contadores acumulados de sus búsquedas y cada movimiento de la raíz
     game_board = TicTacBoard() # Crea una instancia del tablero
+    stats = SearchStats(trace=trace_path is not None) # Contadores de todas las búsquedas de la partida
     human_player = PLAYER_X # El humano será X
     ai_player = PLAYER_O    # La IA será O
     current_player = human_player # El humano empieza
@@ -216,7 +725,9 @@ def play_game():
                 print("Entrada inválida. Ingresa números (1, 2 o 3).")
         else: # Turno de la IA
             print(f"\\nTurno de la IA ({ai_player})")
-            move = get_best_move(game_board, ai_player, human_player, evaluate_board) # La IA calcula su mejor movimiento
+            move = get_best_move(game_board, ai_player, human_player, evaluate_board, stats=stats) # La IA calcula su mejor movimiento
+            if trace_path is not None:
+                stats.dump_json(trace_path)
             if move: # Si la IA encontró un movimiento
                 print(f"Fila elegida: {move[0] + 1}\\nColumna elegida: {move[1] + 1}")
                 game_board.make_move(move, ai_player) # Realiza el movimiento
@@ -243,6 +754,24 @@ def play_game():
                     print(f"\n¡La IA ({winner}) ha ganado!")
             break # Termina el bucle del juego
 
+def main(argv=None):
+    # Línea de comandos; argv como en sys.argv[1:] (por defecto, el de este proceso)
+    parser = argparse.ArgumentParser(description="Tres en Raya con Minimax")
+    parser.add_argument("--build-table", nargs="?", const=SOLVED_TABLE_PATH, metavar="RUTA",
+                        help="resuelve el juego y escribe la tabla precalculada (por defecto junto al script)")
+    parser.add_argument("--trace", metavar="RUTA",
+                        help="escribe en RUTA (JSON) las estadísticas de las búsquedas de la IA")
+    parser.add_argument("--warm", action="store_true",
+                        help="mapea la tabla precalculada antes de empezar en lugar de en el primer movimiento")
+    args = parser.parse_args(argv)
+    if args.warm:
+        load_solved_table()
+    if args.build_table:
+        entries = build_solved_table(args.build_table)
+        print(f"Tabla escrita en {args.build_table}: {entries} posiciones resueltas")
+    else:
+        play_game(args.trace) # Inicia el juego
+
 if __name__ == "__main__":
     # Este bloque se ejecuta solo si el script se corre directamente (no si se importa como módulo)
-    play_game() # Inicia el juego
+    main()
@@ -1,4 +1,32 @@
+import argparse
+import importlib.util
+import itertools
+import json
 import math
+import mmap
+import os
+import random
+import struct
+import threading
+import time
+
+# Arranque rápido: este script se lanza muchas veces como proceso de corta duración, así que los
+# módulos que solo necesitan algunas funciones se importan al usarlas por primera vez:
+# multiprocessing y concurrent.futures (búsqueda en paralelo), sqlite3 (PositionCache) y NumPy,
+# que es opcional (get_best_moves(..., vectorized=True) y NumpyTicTacBoard) y tarda más en
+# importarse que todo lo demás. warm_up() (--warm) lo carga todo de antemano.
+np = None # NumPy una vez importado (_require_numpy)
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+def _require_numpy():
+    # Importa NumPy la primera vez que hace falta
+    global np
+    if np is None:
+        if not HAVE_NUMPY:
+            raise ValueError("Esta función requiere NumPy, que no está instalado.")
+        import numpy
+        np = numpy
+    return np
 
 # --- Constantes y Clases Fundamentales ---
 
@@ -11,16 +39,235 @@ class State:
     OVER    = "OVER"    # Estado de juego terminado (alguien ganó)
     PLAYING = "PLAYING" # Estado de juego en curso
 
+# --- Hashing Zobrist y Tabla de Transposición ---
+
+ZOBRIST_SEED = 0x5EED   # Semilla fija: las claves son las mismas en todas las ejecuciones
+DEFAULT_TT_ENTRIES = 1 << 18 # Número máximo de entradas de la tabla de transposición por defecto
+
+_zobrist_tables = {} # Tablas Zobrist ya generadas, por tamaño de tablero
+
+def get_zobrist_table(n):
+    # Devuelve, para un tablero n x n, un número aleatorio de 64 bits por cada (casilla, marca).
+    # La clave de una posición es el XOR de los números de sus casillas ocupadas, por lo que
+    # se actualiza en O(1) al hacer o deshacer un movimiento.
+    if n not in _zobrist_tables:
+        rng = random.Random(ZOBRIST_SEED + n)
+        _zobrist_tables[n] = {(r, c): {PLAYER_X: rng.getrandbits(64), PLAYER_O: rng.getrandbits(64)}
+                              for r in range(n) for c in range(n)}
+    return _zobrist_tables[n]
+
+# Claves que se combinan con la de la posición para distinguir a quién le toca mover
+_turn_rng = random.Random(ZOBRIST_SEED)
+ZOBRIST_TURN = {PLAYER_X: _turn_rng.getrandbits(64), PLAYER_O: _turn_rng.getrandbits(64)}
+
+# --- Simetrías del tablero ---
+
+_symmetries = {}         # Simetrías ya calculadas, por tamaño de tablero
+_symmetric_zobrist = {}  # Claves Zobrist de cada casilla vista desde cada simetría, por tamaño
+
+def get_symmetries(n):
+    # Devuelve las 8 simetrías del cuadrado (identidad, 3 giros y 4 reflexiones) como una lista
+    # de diccionarios casilla -> casilla transformada, y la lista con el índice de la simetría
+    # inversa de cada una. La simetría 0 es siempre la identidad.
+    if n not in _symmetries:
+        last = n - 1
+        formulas = [lambda r, c: (r, c),               # Identidad
+                    lambda r, c: (c, last - r),        # Giro de 90 grados
+                    lambda r, c: (last - r, last - c), # Giro de 180 grados
+                    lambda r, c: (last - c, r),        # Giro de 270 grados
+                    lambda r, c: (r, last - c),        # Reflexión horizontal
+                    lambda r, c: (last - r, c),        # Reflexión vertical
+                    lambda r, c: (c, r),               # Reflexión en la diagonal principal
+                    lambda r, c: (last - c, last - r)] # Reflexión en la diagonal secundaria
+        transforms = [{(r, c): formula(r, c) for r in range(n) for c in range(n)} for formula in formulas]
+        inverses = [next(j for j, other in enumerate(transforms) if all(other[t[cell]] == cell for cell in t))
+                    for t in transforms]
+        _symmetries[n] = (transforms, inverses)
+    return _symmetries[n]
+
+def get_symmetric_zobrist(n):
+    # Para cada (casilla, marca), las 8 claves Zobrist que tendría la casilla en cada tablero
+    # transformado. Con ellas el tablero mantiene a la vez la clave de sus 8 versiones simétricas.
+    if n not in _symmetric_zobrist:
+        zobrist = get_zobrist_table(n)
+        transforms, _ = get_symmetries(n)
+        _symmetric_zobrist[n] = {cell: {mark: [zobrist[t[cell]][mark] for t in transforms] for mark in (PLAYER_X, PLAYER_O)}
+                                 for cell in zobrist}
+    return _symmetric_zobrist[n]
+
+def canonical_key(board):
+    # Devuelve (clave, simetría): la menor de las 8 claves Zobrist de las versiones simétricas
+    # del tablero y el índice de la simetría que la produce. Todas las posiciones equivalentes
+    # por giro o reflexión comparten la clave, por lo que sirve como clave de cualquier caché.
+    key = min(board.sym_keys)
+    return key, board.sym_keys.index(key)
+
+def canonical_form(board):
+    # Forma canónica exacta (sin hashing) del tablero: la menor, como tupla de filas, de sus 8
+    # versiones simétricas, junto con el índice de la simetría que la produce
+    transforms, inverses = get_symmetries(board.n)
+    grid = board.board
+    forms = []
+    for index in range(len(transforms)):
+        source = transforms[inverses[index]] # Casilla de origen de cada casilla transformada
+        forms.append((tuple("".join(grid[source[(r, c)][0]][source[(r, c)][1]] for c in range(board.n))
+                            for r in range(board.n)), index))
+    return min(forms)
+
+def unique_moves(board, moves):
+    # Elimina los movimientos equivalentes por simetría: si el tablero es simétrico respecto a
+    # alguna transformación, las casillas que esta intercambia llevan a posiciones equivalentes
+    # y solo se conserva la primera de cada grupo (en el orden de 'moves')
+    keys = board.sym_keys
+    symmetric = [t for t in range(1, len(keys)) if keys[t] == keys[0]]
+    if not symmetric:
+        return moves
+    transforms, _ = get_symmetries(board.n)
+    seen = set()
+    result = []
+    for move in moves:
+        if move not in seen:
+            result.append(move)
+            seen.update(transforms[t][move] for t in symmetric)
+    return result
+
+class Bound:
+    # Tipo de puntuación guardada en la tabla de transposición
+    EXACT = "EXACT" # Puntuación exacta
+    LOWER = "LOWER" # Cota inferior (la búsqueda se cortó por beta)
+    UPPER = "UPPER" # Cota superior (ningún movimiento superó a alpha)
+
+class TranspositionTable:
+    # Tabla de transposición de tamaño fijo: guarda el resultado de posiciones ya buscadas para no
+    # repetir la búsqueda cuando se llega a ellas por otro orden de movimientos.
+    # Cada entrada es una tupla (clave, puntuación, tipo de cota, profundidad, mejor movimiento),
+    # donde la profundidad es cuántos movimientos por debajo de la posición se buscaron.
+    # Políticas de reemplazo cuando dos posiciones caen en la misma casilla de la tabla:
+    # - "depth": se conserva la entrada buscada a más profundidad (más cara de recalcular).
+    # - "two-tier": cada casilla tiene dos entradas, una que prefiere profundidad y otra que
+    #   siempre se reemplaza con la más reciente.
+    POLICIES = ("depth", "two-tier")
+
+    def __init__(self, max_entries=DEFAULT_TT_ENTRIES, policy="depth"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de reemplazo desconocida: {policy}. Usa una de {self.POLICIES}.")
+        if max_entries < 2:
+            raise ValueError("La tabla de transposición debe tener al menos 2 entradas.")
+        self.policy = policy
+        self.max_entries = max_entries
+        self.buckets = max_entries // 2 if policy == "two-tier" else max_entries
+        self.entries = [None] * (self.buckets * 2 if policy == "two-tier" else self.buckets)
+        self.probes = 0 # Consultas realizadas
+        self.hits = 0   # Consultas que encontraron la posición
+
+    def __len__(self):
+        # Número de entradas ocupadas
+        return sum(1 for entry in self.entries if entry is not None)
+
+    def clear(self):
+        self.entries = [None] * len(self.entries)
+
+    def probe(self, key):
+        # Devuelve la entrada guardada para 'key', o None si no está
+        self.probes += 1
+        if self.policy == "two-tier":
+            index = (key % self.buckets) * 2
+            for entry in (self.entries[index], self.entries[index + 1]):
+                if entry is not None and entry[0] == key:
+                    self.hits += 1
+                    return entry
+            return None
+        entry = self.entries[key % self.buckets]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, score, bound, depth, best_move):
+        # Guarda el resultado de una búsqueda respetando la política de reemplazo
+        new_entry = (key, score, bound, depth, best_move)
+        if self.policy == "two-tier":
+            index = (key % self.buckets) * 2
+            deep = self.entries[index]
+            if deep is None or deep[0] == key or depth >= deep[3]:
+                if deep is not None and deep[0] != key:
+                    self.entries[index + 1] = deep # La entrada desplazada pasa a la parte de reemplazo siempre
+                self.entries[index] = new_entry
+            else:
+                self.entries[index + 1] = new_entry
+            return
+        index = key % self.buckets
+        old = self.entries[index]
+        if old is None or old[0] == key or depth >= old[3]:
+            self.entries[index] = new_entry
+
+def build_lines(n, k=None):
+    # Devuelve las líneas ganadoras de un tablero n x n como listas de casillas, y para cada casilla
+    # los índices de las líneas que pasan por ella. Una línea son k casillas consecutivas en
+    # horizontal, vertical o diagonal; con k = n (por defecto) son las filas, las columnas y
+    # las dos diagonales principales.
+    k = n if k is None else k
+    lines = []
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)): # Filas, columnas, diagonales y antidiagonales
+        for r in range(n):
+            for c in range(n):
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < n and 0 <= end_c < n:
+                    lines.append([(r + dr * i, c + dc * i) for i in range(k)])
+    lines_by_cell = {(r, c): [] for r in range(n) for c in range(n)}
+    for index, line in enumerate(lines):
+        for cell in line:
+            lines_by_cell[cell].append(index)
+    return lines, lines_by_cell
+
+LINE_WEIGHT_BASE = 4 # Una línea abierta con c marcas vale LINE_WEIGHT_BASE ** (c - 1) en la heurística
+
+def line_weights(k):
+    # Peso de una línea abierta (sin marcas del oponente) según cuántas marcas propias tiene
+    return [0] + [LINE_WEIGHT_BASE ** (c - 1) for c in range(1, k + 1)]
+
+def _check_size(n, k):
+    # Valida el tamaño del tablero y la longitud de la línea ganadora, y devuelve esta última
+    if n < 3:
+        raise ValueError("El tamaño del tablero (n) debe ser al menos 3.")
+    k = n if k is None else k
+    if not 2 <= k <= n:
+        raise ValueError(f"Las marcas en raya para ganar (k) deben estar entre 2 y {n}.")
+    return k
+
 class TicTacBoard:
-    # Representa el tablero y la lógica del juego Tres en Raya para un tablero de n x n
-    def __init__(self, n=3):
-        if n < 3:
-            raise ValueError("El tamaño del tablero (n) debe ser al menos 3.")
+    # Representa el tablero y la lógica del juego Tres en Raya para un tablero de n x n.
+    # Gana quien consigue k marcas seguidas en horizontal, vertical o diagonal (por defecto k = n).
+    # Atributos fijos: el acceso es algo más rápido y cada tablero ocupa menos memoria
+    __slots__ = ("k", "n", "board", "empty_count", "winner", "moves_history", "winner_history", "lines", "lines_by_cell",
+                 "line_counts", "line_weights", "line_score", "sym_zobrist", "sym_keys", "zobrist_key", "tt")
+
+    def __init__(self, n=3, tt_max_entries=DEFAULT_TT_ENTRIES, tt_policy="depth", k=None):
+        self.k = _check_size(n, k)
         self.n = n
         # Inicializa el tablero como una cuadrícula de n x n vacía
         self.board = [[' ' for _ in range(n)] for _ in range(n)]
+        self.empty_count = n * n # Casillas vacías, actualizado en make_move/undo
         self.winner = None  # Almacena quién ganó (PLAYER_X o PLAYER_O), o None si nadie ha ganado aún
         self.moves_history = [] # Guarda el historial de movimientos (coordenadas)
+        self.winner_history = [] # Ganador antes de cada movimiento, para que undo lo restaure
+
+        # Líneas ganadoras precalculadas y, para cada casilla, las líneas que pasan por ella
+        self.lines, self.lines_by_cell = build_lines(n, self.k)
+        # Marcas de cada jugador en cada línea, actualizadas en make_move/undo
+        self.line_counts = {PLAYER_X: [0] * len(self.lines), PLAYER_O: [0] * len(self.lines)}
+        # Suma de los pesos de las líneas abiertas de cada jugador (para la evaluación heurística),
+        # actualizada también en make_move/undo
+        self.line_weights = line_weights(self.k)
+        self.line_score = {PLAYER_X: 0, PLAYER_O: 0}
+
+        # Claves Zobrist de la posición y de sus 8 versiones simétricas (sym_keys[0] es la de la
+        # propia posición), actualizadas en make_move/undo
+        self.sym_zobrist = get_symmetric_zobrist(n)
+        self.sym_keys = [0] * 8
+        self.zobrist_key = 0
+        # Tabla de transposición que se conserva durante toda la partida
+        self.tt = TranspositionTable(tt_max_entries, tt_policy)
 
     def print_board(self):
         # Imprime el estado actual del tablero en la consola
@@ -48,8 +295,26 @@ class TicTacBoard:
         r, c = move
         if 0 <= r < self.n and 0 <= c < self.n and self.board[r][c] == ' ': # Si la casilla está vacía y dentro de los límites
             self.board[r][c] = mark # Coloca la marca del jugador
+            self._update_keys(move, mark) # Actualiza la clave de la posición
             self.moves_history.append(move) # Registra el movimiento
-            self._check_win() # Verifica si este movimiento resultó en una victoria
+            self.winner_history.append(self.winner)
+            self.empty_count -= 1
+            # Verifica si este movimiento resultó en una victoria: solo puede completarse
+            # una línea que pase por la casilla recién marcada
+            opponent_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+            counts = self.line_counts[mark]
+            opponent_counts = self.line_counts[opponent_mark]
+            weights = self.line_weights
+            for index in self.lines_by_cell[move]:
+                own = counts[index]
+                opponent = opponent_counts[index]
+                if opponent == 0: # La línea sigue abierta para 'mark' y gana peso
+                    self.line_score[mark] += weights[own + 1] - weights[own]
+                elif own == 0:    # La línea deja de estar abierta para el oponente
+                    self.line_score[opponent_mark] -= weights[opponent]
+                counts[index] = own + 1
+                if own + 1 == self.k:
+                    self.winner = mark
         else:
             # Este error no debería ocurrir si se usa get_possible_moves() correctamente
             # y la validación de entrada del usuario es correcta.
@@ -62,48 +327,316 @@ class TicTacBoard:
             return
         last_move = self.moves_history.pop() # Obtiene y elimina el último movimiento del historial
         r, c = last_move
+        mark = self.board[r][c]
+        self._update_keys(last_move, mark) # Quita la marca de la clave
         self.board[r][c] = ' ' # Limpia la casilla en el tablero
-        self.winner = None # Anula cualquier ganador, ya que el estado del juego cambió
+        self.empty_count += 1
+        opponent_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+        counts = self.line_counts[mark]
+        opponent_counts = self.line_counts[opponent_mark]
+        weights = self.line_weights
+        for index in self.lines_by_cell[last_move]:
+            own = counts[index] - 1
+            opponent = opponent_counts[index]
+            if opponent == 0:
+                self.line_score[mark] -= weights[own + 1] - weights[own]
+            elif own == 0:
+                self.line_score[opponent_mark] += weights[opponent]
+            counts[index] = own
+        self.winner = self.winner_history.pop() # Restaura el ganador que había antes del movimiento
 
-    def _check_win(self):
-        # Método privado para verificar si hay un ganador después de un movimiento
-        
-        # Comprobar filas
-        for r in range(self.n):
-            if self.board[r][0] != ' ' and all(self.board[r][c] == self.board[r][0] for c in range(self.n)):
-                self.winner = self.board[r][0]
-                return
-
-        # Comprobar columnas
-        for c in range(self.n):
-            if self.board[0][c] != ' ' and all(self.board[r][c] == self.board[0][c] for r in range(self.n)):
-                self.winner = self.board[0][c]
-                return
-
-        # Comprobar diagonal principal (top-left to bottom-right)
-        if self.board[0][0] != ' ' and all(self.board[i][i] == self.board[0][0] for i in range(self.n)):
-            self.winner = self.board[0][0]
-            return
-
-        # Comprobar diagonal secundaria (top-right to bottom-left)
-        if self.board[0][self.n - 1] != ' ' and all(self.board[i][self.n - 1 - i] == self.board[0][self.n - 1] for i in range(self.n)):
-            self.winner = self.board[0][self.n - 1]
-            return
-        
-        # Si no se encontró ninguna línea ganadora, self.winner permanece None
+    def _update_keys(self, move, mark):
+        # Pone o quita (el XOR es su propio inverso) la marca en las claves Zobrist
+        keys = self.sym_keys
+        for index, value in enumerate(self.sym_zobrist[move][mark]):
+            keys[index] ^= value
+        self.zobrist_key = keys[0]
 
     def get_winner(self):
         # Devuelve la marca del jugador ganador, o None si no hay ganador
         return self.winner
 
+    def count_in_line(self, index, mark):
+        # Devuelve cuántas casillas de la línea 'index' tienen la marca 'mark'
+        return self.line_counts[mark][index]
+
+    def can_still_win(self, mark, moves_left):
+        # Devuelve True si 'mark' todavía puede completar alguna línea con los 'moves_left'
+        # movimientos que le quedan: la línea no debe tener marcas del oponente y sus casillas
+        # vacías no pueden ser más que los movimientos restantes
+        opponent_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+        for index in range(len(self.lines)):
+            if self.count_in_line(index, opponent_mark) == 0 and self.k - self.count_in_line(index, mark) <= moves_left:
+                return True
+        return False
+
     def get_state(self):
         # Devuelve el estado actual del juego
         if self.winner: # Si hay un ganador
             return State.OVER # El juego terminó
-        if not self.get_possible_moves(): # Si no hay ganador Y no quedan movimientos posibles
+        if not self.empty_count: # Si no hay ganador Y no quedan movimientos posibles
             return State.DRAW # Es un empate
         return State.PLAYING # De lo contrario, el juego sigue en curso
 
+class BitTicTacBoard:
+    # Representación alternativa y compacta del tablero n x n, con la misma interfaz pública que
+    # TicTacBoard (make_move, undo, get_state, get_winner, get_possible_moves, ...), de modo que
+    # los algoritmos de búsqueda pueden usar cualquiera de las dos.
+    # Cada jugador se guarda como un único entero (máscara de bits): la casilla (r, c) es el bit r * n + c.
+    # Las casillas vacías, la comprobación de tablero lleno y la de victoria son operaciones de bits,
+    # con las líneas ganadoras precalculadas como máscaras.
+    __slots__ = ("k", "n", "bits", "full_mask", "winner", "moves_history", "winner_history", "cells", "lines", "lines_by_cell",
+                 "line_masks", "masks_by_bit", "line_weights", "line_score", "sym_zobrist", "sym_keys", "zobrist_key", "tt")
+
+    def __init__(self, n=3, tt_max_entries=DEFAULT_TT_ENTRIES, tt_policy="depth", k=None):
+        self.k = _check_size(n, k)
+        self.n = n
+        self.bits = {PLAYER_X: 0, PLAYER_O: 0} # Máscara de casillas ocupadas por cada jugador
+        self.full_mask = (1 << (n * n)) - 1    # Máscara con todas las casillas
+        self.winner = None
+        self.moves_history = []
+        self.winner_history = []
+        self.cells = [(r, c) for r in range(n) for c in range(n)] # Casilla correspondiente a cada bit
+
+        self.lines, self.lines_by_cell = build_lines(n, self.k)
+        self.line_masks = [sum(1 << (r * n + c) for r, c in line) for line in self.lines]
+        # Máscaras de las líneas que pasan por cada bit, para comprobar la victoria solo en ellas
+        self.masks_by_bit = [[self.line_masks[index] for index in self.lines_by_cell[cell]] for cell in self.cells]
+        self.line_weights = line_weights(self.k)
+        self.line_score = {PLAYER_X: 0, PLAYER_O: 0}
+
+        self.sym_zobrist = get_symmetric_zobrist(n)
+        self.sym_keys = [0] * 8
+        self.zobrist_key = 0
+        self.tt = TranspositionTable(tt_max_entries, tt_policy)
+
+    @property
+    def board(self):
+        # Cuadrícula de caracteres equivalente a TicTacBoard.board (solo para mostrarla o inspeccionarla)
+        grid = [[' ' for _ in range(self.n)] for _ in range(self.n)]
+        for mark, bits in self.bits.items():
+            for index, (r, c) in enumerate(self.cells):
+                if bits >> index & 1:
+                    grid[r][c] = mark
+        return grid
+
+    def print_board(self):
+        TicTacBoard.print_board(self)
+
+    def get_possible_moves(self):
+        # Recorre los bits de las casillas vacías de menor a mayor (mismo orden que TicTacBoard)
+        empty = self.full_mask & ~(self.bits[PLAYER_X] | self.bits[PLAYER_O])
+        moves = []
+        while empty:
+            lowest = empty & -empty # Bit vacío más bajo
+            moves.append(self.cells[lowest.bit_length() - 1])
+            empty ^= lowest
+        return moves
+
+    def make_move(self, move, mark):
+        r, c = move
+        index = r * self.n + c
+        bit = 1 << index
+        if 0 <= r < self.n and 0 <= c < self.n and not (self.bits[PLAYER_X] | self.bits[PLAYER_O]) & bit:
+            self._update_line_score(index, mark, 1)
+            self.bits[mark] |= bit
+            self._update_keys(move, mark)
+            self.moves_history.append(move)
+            self.winner_history.append(self.winner)
+            # Solo puede haber ganado con una línea que pase por la casilla recién marcada
+            bits = self.bits[mark]
+            for mask in self.masks_by_bit[index]:
+                if bits & mask == mask:
+                    self.winner = mark
+                    break
+        else:
+            print(f"´\nError: Movimiento inválido en {move} para el tablero {self.n}x{self.n}")
+
+    def undo(self):
+        if not self.moves_history:
+            return
+        move = self.moves_history.pop()
+        bit = 1 << (move[0] * self.n + move[1])
+        mark = PLAYER_X if self.bits[PLAYER_X] & bit else PLAYER_O
+        self.bits[mark] &= ~bit
+        self._update_line_score(move[0] * self.n + move[1], mark, -1)
+        self._update_keys(move, mark)
+        self.winner = self.winner_history.pop()
+
+    def _update_line_score(self, index, mark, sign):
+        # Actualiza line_score al poner (sign = 1) o quitar (sign = -1) la marca del bit 'index';
+        # se llama siempre con esa casilla vacía, igual que TicTacBoard hace con sus contadores
+        opponent_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+        own_bits = self.bits[mark]
+        opponent_bits = self.bits[opponent_mark]
+        weights = self.line_weights
+        for mask in self.masks_by_bit[index]:
+            own = (own_bits & mask).bit_count()
+            opponent = (opponent_bits & mask).bit_count()
+            if opponent == 0:
+                self.line_score[mark] += sign * (weights[own + 1] - weights[own])
+            elif own == 0:
+                self.line_score[opponent_mark] -= sign * weights[opponent]
+
+    _update_keys = TicTacBoard._update_keys
+
+    def get_winner(self):
+        return self.winner
+
+    def count_in_line(self, index, mark):
+        return (self.bits[mark] & self.line_masks[index]).bit_count()
+
+    def can_still_win(self, mark, moves_left):
+        # Igual que TicTacBoard.can_still_win, con máscaras: una línea sigue abierta si no tiene
+        # marcas del oponente y le faltan como mucho 'moves_left' casillas
+        own = self.bits[mark]
+        opponent = self.bits[PLAYER_O if mark == PLAYER_X else PLAYER_X]
+        for mask in self.line_masks:
+            if not opponent & mask and self.k - (own & mask).bit_count() <= moves_left:
+                return True
+        return False
+
+    def get_state(self):
+        if self.winner:
+            return State.OVER
+        if self.bits[PLAYER_X] | self.bits[PLAYER_O] == self.full_mask:
+            return State.DRAW
+        return State.PLAYING
+
+class NumpyTicTacBoard:
+    # Representación del tablero n x n con NumPy (requiere NumPy), con la misma interfaz pública que
+    # TicTacBoard, pensada para tableros grandes (8x8 o más) con búsqueda de profundidad limitada,
+    # donde los bucles en Python sobre casillas y líneas son lo más costoso.
+    # Las casillas son un array int8 (1 = X, -1 = O, 0 = vacía) y las marcas de cada jugador en cada
+    # línea, arrays que make_move/undo actualizan de una vez en todas las líneas de la casilla.
+    # Las líneas abiertas (line_score, para la heurística) y la prioridad de todos los movimientos
+    # de un nodo (sort_moves, que usa order_moves) se calculan con operaciones sobre todas las líneas.
+    __slots__ = ("k", "n", "squares", "empty_count", "winner", "moves_history", "winner_history", "cells", "lines",
+                 "lines_by_cell", "lines_by_index", "entry_lines", "entry_cells", "center_distance", "line_counts",
+                 "line_weights", "weights", "sym_zobrist", "sym_keys", "zobrist_key", "tt")
+
+    def __init__(self, n=3, tt_max_entries=DEFAULT_TT_ENTRIES, tt_policy="depth", k=None):
+        _require_numpy()
+        self.k = _check_size(n, k)
+        self.n = n
+        self.squares = np.zeros(n * n, dtype=np.int8) # Casilla (r, c) en la posición r * n + c
+        self.empty_count = n * n
+        self.winner = None
+        self.moves_history = []
+        self.winner_history = []
+        self.cells = [(r, c) for r in range(n) for c in range(n)]
+
+        self.lines, self.lines_by_cell = build_lines(n, self.k)
+        # Líneas que pasan por cada casilla, como array para actualizar sus contadores de una vez
+        self.lines_by_index = [np.array(self.lines_by_cell[cell], dtype=np.intp) for cell in self.cells]
+        # Pares (línea, casilla) de todas las líneas, para sumar en cada casilla lo de sus líneas
+        self.entry_lines = np.array([index for index, line in enumerate(self.lines) for _ in line], dtype=np.intp)
+        self.entry_cells = np.array([r * n + c for line in self.lines for r, c in line], dtype=np.intp)
+        center = (n - 1) / 2
+        self.center_distance = np.array([abs(r - center) + abs(c - center) for r, c in self.cells])
+        self.line_counts = {PLAYER_X: np.zeros(len(self.lines), dtype=np.int32),
+                            PLAYER_O: np.zeros(len(self.lines), dtype=np.int32)}
+        self.line_weights = line_weights(self.k)
+        self.weights = np.array(self.line_weights, dtype=np.int64)
+
+        self.sym_zobrist = get_symmetric_zobrist(n)
+        self.sym_keys = [0] * 8
+        self.zobrist_key = 0
+        self.tt = TranspositionTable(tt_max_entries, tt_policy)
+
+    @property
+    def board(self):
+        # Cuadrícula de caracteres equivalente a TicTacBoard.board (solo para mostrarla o inspeccionarla)
+        symbols = {0: ' ', 1: PLAYER_X, -1: PLAYER_O}
+        values = self.squares.tolist()
+        return [[symbols[value] for value in values[r * self.n:(r + 1) * self.n]] for r in range(self.n)]
+
+    @property
+    def line_score(self):
+        # Suma de los pesos de las líneas abiertas de cada jugador, calculada sobre todas las líneas
+        # a la vez (los otros tableros la mantienen en make_move/undo)
+        x_counts, o_counts = self.line_counts[PLAYER_X], self.line_counts[PLAYER_O]
+        return {PLAYER_X: int(self.weights[x_counts] @ (o_counts == 0)),
+                PLAYER_O: int(self.weights[o_counts] @ (x_counts == 0))}
+
+    def print_board(self):
+        TicTacBoard.print_board(self)
+
+    def get_possible_moves(self):
+        # Casillas vacías en orden natural (mismo orden que TicTacBoard)
+        cells = self.cells
+        return [cells[index] for index in (self.squares == 0).nonzero()[0].tolist()]
+
+    def make_move(self, move, mark):
+        r, c = move
+        index = r * self.n + c
+        if 0 <= r < self.n and 0 <= c < self.n and not self.squares[index]:
+            self.squares[index] = 1 if mark == PLAYER_X else -1
+            self._update_keys(move, mark)
+            self.moves_history.append(move)
+            self.winner_history.append(self.winner)
+            self.empty_count -= 1
+            # Suma la marca en todas las líneas de la casilla; solo alguna de ellas puede completarse
+            lines = self.lines_by_index[index]
+            counts = self.line_counts[mark]
+            counts[lines] += 1
+            if counts[lines].max() == self.k:
+                self.winner = mark
+        else:
+            print(f"´\nError: Movimiento inválido en {move} para el tablero {self.n}x{self.n}")
+
+    def undo(self):
+        if not self.moves_history:
+            return
+        move = self.moves_history.pop()
+        index = move[0] * self.n + move[1]
+        mark = PLAYER_X if self.squares[index] == 1 else PLAYER_O
+        self.squares[index] = 0
+        self.line_counts[mark][self.lines_by_index[index]] -= 1
+        self._update_keys(move, mark)
+        self.empty_count += 1
+        self.winner = self.winner_history.pop()
+
+    _update_keys = TicTacBoard._update_keys
+
+    def sort_moves(self, moves, mark):
+        # Ordena 'moves' con la misma prioridad que order_moves, puntuando todos a la vez: cada línea
+        # recibe la puntuación que aporta a sus casillas vacías, se suma en cada casilla la de sus
+        # líneas y se ordena por puntuación y, a igualdad, por cercanía al centro y por el orden de 'moves'
+        own = self.line_counts[mark]
+        opponent = self.line_counts[PLAYER_O if mark == PLAYER_X else PLAYER_X]
+        k = self.k
+        line_scores = np.where(opponent == 0, np.where(own == k - 1, 100000, 1 + own * own),
+                               np.where(own == 0, np.where(opponent == k - 1, 10000, opponent * opponent), 0))
+        cell_scores = np.bincount(self.entry_cells, weights=line_scores[self.entry_lines], minlength=self.n * self.n)
+        indices = np.array([r * self.n + c for r, c in moves], dtype=np.intp)
+        order = np.lexsort((self.center_distance[indices], -cell_scores[indices])) # lexsort es estable
+        return [moves[position] for position in order.tolist()]
+
+    def get_winner(self):
+        return self.winner
+
+    def count_in_line(self, index, mark):
+        return int(self.line_counts[mark][index])
+
+    def can_still_win(self, mark, moves_left):
+        # Igual que TicTacBoard.can_still_win, comprobando todas las líneas a la vez
+        own = self.line_counts[mark]
+        opponent = self.line_counts[PLAYER_O if mark == PLAYER_X else PLAYER_X]
+        return bool(((opponent == 0) & (own >= self.k - moves_left)).any())
+
+    def get_state(self):
+        if self.winner:
+            return State.OVER
+        if not self.empty_count:
+            return State.DRAW
+        return State.PLAYING
+
+# Representaciones del tablero disponibles, por nombre
+BOARD_BACKENDS = {"list": TicTacBoard, "bitboard": BitTicTacBoard}
+if HAVE_NUMPY:
+    BOARD_BACKENDS["numpy"] = NumpyTicTacBoard
+
 # --- Función de Evaluación Separada ---
 def evaluate_board(board, maximizer_mark):
     """
@@ -124,6 +657,24 @@ def evaluate_board(board, maximizer_mark):
     # Esta función solo debería ser llamada para estados terminales en este contexto.
     return None # Opcionalmente, lanzar un error si se llama inesperadamente.
 
+HEURISTIC_SCALE = 64 # Diferencia de líneas con la que la heurística vale 0.5
+
+def evaluate_open_lines(board, maximizer_mark):
+    """
+    Evaluación heurística para la búsqueda con profundidad limitada.
+    En posiciones terminales devuelve lo mismo que evaluate_board. En el resto compara las
+    líneas abiertas de cada jugador (board.line_score, que el tablero mantiene al hacer y
+    deshacer movimientos) y devuelve un valor estrictamente entre -1 y 1, para que una
+    victoria o una derrota reales pesen siempre más que cualquier estimación.
+    Es antisimétrica: evaluar para el oponente devuelve el mismo valor cambiado de signo.
+    """
+    if board.get_state() != State.PLAYING:
+        return evaluate_board(board, maximizer_mark)
+    opponent_mark = PLAYER_O if maximizer_mark == PLAYER_X else PLAYER_X
+    line_score = board.line_score
+    difference = line_score[maximizer_mark] - line_score[opponent_mark]
+    return difference / (abs(difference) + HEURISTIC_SCALE)
+
 '''
     --- Algoritmo Minimax ---
     Este algoritmo ayuda a la IA a decidir cuál es el mejor movimiento.
@@ -131,8 +682,8 @@ def evaluate_board(board, maximizer_mark):
     maximiza su puntuación (si es el turno de la IA) o minimiza la puntuación del oponente.
     Ahora también devuelve el movimiento que lleva a esa puntuación desde el nivel actual.
     Nota: Para tableros más grandes (n > 3 o 4), el algoritmo Minimax puede volverse muy lento 
-    debido al crecimiento exponencial del árbol de búsqueda. Se requerirían optimizaciones
-    como la poda Alfa-Beta o limitar la profundidad de búsqueda para tableros grandes.
+    debido al crecimiento exponencial del árbol de búsqueda. Para esos tableros se usa
+    minimax_alpha_beta, más abajo.
 '''
 def minimax(board, is_maximizing_turn, maximizer_mark, depth):
     # board: el estado actual del tablero
@@ -179,14 +730,1498 @@ def minimax(board, is_maximizing_turn, maximizer_mark, depth):
                 best_move_at_this_level = move
         return best_score, best_move_at_this_level
 
-def get_best_move(board, ai_mark):
+# --- Poda Alfa-Beta ---
+
+NULL_WINDOW = 1e-6 # Anchura de la ventana nula usada por la búsqueda de variante principal (PVS)
+WIN_SCORE = 1      # Puntuación máxima que devuelve evaluate_board (victoria del maximizador)
+
+DEADLINE_CHECK_INTERVAL = 256 # Cada cuántos nodos se consulta el reloj en las búsquedas con límite de tiempo
+
+class SearchAborted(Exception):
+    # Se lanza dentro de la búsqueda cuando se agota el presupuesto de nodos o de tiempo
+    pass
+
+class SearchStats:
+    # Contadores de una búsqueda, para poder comparar el coste de los distintos algoritmos.
+    # Se pasan opcionalmente a get_best_move, search_best_move o minimax_alpha_beta; sin ellos
+    # la búsqueda no cuenta nada. Los contadores se acumulan si se reutilizan en varias búsquedas.
+    # on_root_move: función (movimiento, puntuación, stats) que se llama tras buscar cada
+    #               movimiento de la raíz. La puntuación puede ser solo una cota si el movimiento
+    #               se descartó con la ventana nula.
+    # on_iteration: función (profundidad, movimiento, puntuación, stats) que se llama al completar
+    #               cada iteración de la profundización iterativa
+    # trace: si es True se guarda también cada uno de esos eventos en 'events', para dump_json
+    def __init__(self, on_root_move=None, on_iteration=None, trace=False):
+        self.nodes = 0          # Nodos visitados (llamadas recursivas)
+        self.evaluations = 0    # Hojas puntuadas: posiciones terminales o cortadas por max_depth
+        self.tt_hits = 0        # Consultas a la tabla de transposición que encontraron la posición
+        self.tt_cutoffs = 0     # Nodos resueltos directamente con la tabla de transposición
+        self.cutoffs = 0        # Podas alfa-beta (el resto de movimientos del nodo no se buscó)
+        self.book_hits = 0      # Búsquedas respondidas con el libro de aperturas
+        self.cache_hits = 0     # Búsquedas respondidas con la caché persistente (PositionCache)
+        self.nodes_by_depth = [] # Nodos visitados a cada profundidad (la raíz es la 0)
+        self.elapsed = 0.0      # Segundos empleados en get_best_move / search_best_move
+        self.on_root_move = on_root_move
+        self.on_iteration = on_iteration
+        self.trace = trace
+        self.events = []
+        self._start = time.perf_counter()
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def branching_factor(self):
+        # Factor de ramificación efectivo: el b tal que b ** profundidad máxima alcanzada = nodos
+        if len(self.nodes_by_depth) < 2:
+            return 0.0
+        return self.nodes ** (1 / (len(self.nodes_by_depth) - 1))
+
+    def root_move(self, move, score):
+        # Lo llama minimax_alpha_beta (o parallel_minimax) tras buscar un movimiento de la raíz
+        if self.trace:
+            self.events.append({"event": "root_move", "move": list(move), "score": score, "nodes": self.nodes})
+        if self.on_root_move is not None:
+            self.on_root_move(move, score, self)
+
+    def iteration(self, depth, move, score):
+        # Lo llama search_best_move al completar una iteración
+        if self.trace:
+            self.events.append({"event": "iteration", "depth": depth, "move": list(move), "score": score,
+                                "nodes": self.nodes, "elapsed_ms": (time.perf_counter() - self._start) * 1000})
+        if self.on_iteration is not None:
+            self.on_iteration(depth, move, score, self)
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self.elapsed += time.perf_counter() - self._start
+
+    def merge(self, other):
+        # Suma los contadores de otra búsqueda (p. ej. la de un proceso trabajador)
+        self.nodes += other.nodes
+        self.evaluations += other.evaluations
+        self.tt_hits += other.tt_hits
+        self.tt_cutoffs += other.tt_cutoffs
+        self.cutoffs += other.cutoffs
+        for depth, nodes in enumerate(other.nodes_by_depth):
+            if depth < len(self.nodes_by_depth):
+                self.nodes_by_depth[depth] += nodes
+            else:
+                self.nodes_by_depth.append(nodes)
+
+    def to_dict(self):
+        return {"nodes": self.nodes, "evaluations": self.evaluations, "tt_hits": self.tt_hits,
+                "tt_cutoffs": self.tt_cutoffs, "cutoffs": self.cutoffs, "book_hits": self.book_hits,
+                "cache_hits": self.cache_hits, "nodes_by_depth": self.nodes_by_depth,
+                "branching_factor": self.branching_factor, "elapsed_ms": self.elapsed * 1000, "nodes_per_second": self.nodes_per_second}
+
+    def dump_json(self, path):
+        # Escribe los contadores y, si se activó trace, los eventos en un fichero JSON
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.to_dict(), events=self.events), f, indent=2)
+
+    def __str__(self):
+        text = f"{self.nodes} nodos"
+        if self.elapsed > 0:
+            text += f", {self.nodes_per_second:.0f} nodos/s"
+        return text
+
+def order_moves(board, moves, mark, opponent_mark, first_move=None):
+    # Ordena los movimientos para que la poda Alfa-Beta corte cuanto antes:
+    # primero las victorias inmediatas, después los bloqueos de una victoria del oponente,
+    # después las casillas que pasan por más líneas abiertas (amenazas) y, a igualdad, las más centrales.
+    # first_move: movimiento que se prueba antes que ninguno (p. ej. el de la tabla de transposición)
+    k = board.k
+    center = (board.n - 1) / 2
+
+    def priority(move):
+        score = 0
+        for index in board.lines_by_cell[move]:
+            own = board.count_in_line(index, mark)
+            opponent = board.count_in_line(index, opponent_mark)
+            if opponent == 0:
+                score += 100000 if own == k - 1 else 1 + own * own # Victoria inmediata o línea propia abierta
+            elif own == 0:
+                score += 10000 if opponent == k - 1 else opponent * opponent # Bloqueo o línea del oponente
+        distance = abs(move[0] - center) + abs(move[1] - center)
+        return (score, -distance)
+
+    sort_moves = getattr(board, "sort_moves", None) # Tableros que calculan esta misma prioridad a su manera
+    if sort_moves is not None:
+        ordered = sort_moves(moves, mark) # P. ej. NumpyTicTacBoard, para todos los movimientos a la vez
+    else:
+        ordered = sorted(moves, key=priority, reverse=True)
+    if first_move in ordered:
+        ordered.remove(first_move)
+        ordered.insert(0, first_move)
+    return ordered
+
+def _flip_bound(bound):
+    # Al cambiar el punto de vista de una puntuación, las cotas inferiores pasan a ser superiores y viceversa
+    if bound == Bound.LOWER:
+        return Bound.UPPER
+    if bound == Bound.UPPER:
+        return Bound.LOWER
+    return bound
+
+'''
+    --- Algoritmo Minimax con poda Alfa-Beta ---
+    Devuelve la misma puntuación y el mismo movimiento que minimax, pero descarta las ramas
+    que no pueden cambiar la decisión:
+    - alpha es la mejor puntuación ya garantizada para el maximizador y beta la del minimizador;
+      cuando alpha >= beta el resto de movimientos del nodo no puede influir y se poda.
+    - Por debajo de la raíz los movimientos se ordenan con order_moves para podar antes.
+      En la raíz se mantiene el orden natural, de modo que ante empates se elige el mismo
+      movimiento que minimax (el primero con la mejor puntuación).
+    - Búsqueda de variante principal (PVS): el primer movimiento se busca con la ventana completa
+      y el resto con una ventana nula, que solo comprueba si mejoran al primero; si lo hacen,
+      se vuelven a buscar con la ventana completa.
+    - Si ningún jugador puede ya completar una línea con los movimientos que le quedan,
+      la partida acabará en empate y se devuelve 0 sin explorar el resto del árbol.
+    - Como ninguna puntuación supera a WIN_SCORE, la ventana inicial es [-WIN_SCORE, WIN_SCORE]:
+      en cuanto un jugador encuentra una victoria deja de buscar alternativas.
+    - Tabla de transposición (board.tt): cada posición buscada se guarda con su clave Zobrist
+      como puntuación exacta, cota inferior o cota superior, junto con su mejor movimiento.
+      Si se vuelve a llegar a ella por otro orden de movimientos se reutiliza el resultado,
+      y el mejor movimiento guardado se prueba el primero. En la raíz no se usa para cortar,
+      para no alterar el desempate entre movimientos con la misma puntuación.
+    - Con max_depth, al llegar a esa profundidad la posición se puntúa con la función heurística
+      (por defecto evaluate_open_lines) en lugar de seguir buscando hasta el final de la partida.
+    - En la raíz se prueba primero el mejor movimiento guardado en la tabla de transposición
+      (en la profundización iterativa, el de la iteración anterior). Para que el desempate siga
+      siendo el de minimax, un movimiento anterior en el orden natural sustituye al mejor actual
+      también cuando lo iguala.
+    - Simetrías: si la posición es simétrica (por giro o reflexión), de cada grupo de casillas
+      equivalentes solo se busca la primera en el orden natural, y la tabla de transposición usa
+      la clave canónica, de modo que las posiciones giradas o reflejadas se buscan una sola vez.
+'''
+def minimax_alpha_beta(board, is_maximizing_turn, maximizer_mark, depth, alpha=-WIN_SCORE, beta=WIN_SCORE, stats=None,
+                       max_depth=None, heuristic=evaluate_open_lines, max_nodes=None, deadline=None, stop=None):
+    # board, is_maximizing_turn, maximizer_mark y depth: igual que en minimax
+    # alpha, beta: ventana de búsqueda actual
+    # stats: SearchStats opcional donde se acumula el número de nodos visitados
+    # max_depth: profundidad a la que se corta la búsqueda (None = hasta el final de la partida)
+    # heuristic: función (board, maximizer_mark) que puntúa las posiciones no terminales al cortar;
+    #            debe devolver valores entre -WIN_SCORE y WIN_SCORE y ser antisimétrica
+    # max_nodes: si se indica (requiere stats), lanza SearchAborted cuando stats.nodes lo supera
+    # deadline: si se indica (requiere stats), lanza SearchAborted cuando time.perf_counter() lo supera
+    # stop: threading.Event opcional (requiere stats); lanza SearchAborted en cuanto se activa
+    if stats is not None:
+        stats.nodes += 1
+        if depth < len(stats.nodes_by_depth):
+            stats.nodes_by_depth[depth] += 1
+        else:
+            stats.nodes_by_depth.append(1)
+        if max_nodes is not None and stats.nodes > max_nodes:
+            raise SearchAborted()
+        if deadline is not None and stats.nodes % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise SearchAborted()
+        if stop is not None and stats.nodes % DEADLINE_CHECK_INTERVAL == 0 and stop.is_set():
+            raise SearchAborted()
+    limits = (stats, max_depth, heuristic, max_nodes, deadline, stop) # Se pasan igual a todas las llamadas recursivas
+
+    current_state = board.get_state()
+    if current_state == State.DRAW or current_state == State.OVER:
+        if stats is not None:
+            stats.evaluations += 1
+        return evaluate_board(board, maximizer_mark), None
+
+    opponent_mark = PLAYER_O if maximizer_mark == PLAYER_X else PLAYER_X
+    mark = maximizer_mark if is_maximizing_turn else opponent_mark
+    other_mark = opponent_mark if is_maximizing_turn else maximizer_mark
+
+    possible_moves = board.get_possible_moves()
+    empty_squares = len(possible_moves)
+    # Empate asegurado aunque queden casillas libres: el jugador al que le toca mover dispone
+    # de la mitad (redondeando hacia arriba) de las casillas restantes y el otro del resto.
+    # En la raíz se sigue buscando, porque hay que devolver un movimiento.
+    if depth > 0 and not board.can_still_win(mark, (empty_squares + 1) // 2) and not board.can_still_win(other_mark, empty_squares // 2):
+        if stats is not None:
+            stats.evaluations += 1
+        return 0, None
+
+    # Profundidad que se va a buscar por debajo de esta posición: hasta el final de la partida
+    # (las casillas vacías) o hasta max_depth, lo que llegue antes
+    remaining_depth = empty_squares if max_depth is None else min(empty_squares, max_depth - depth)
+    if remaining_depth <= 0:
+        if stats is not None:
+            stats.evaluations += 1
+        return heuristic(board, maximizer_mark), None
+
+    # Las casillas equivalentes por simetría llevan a posiciones equivalentes: solo se busca una
+    possible_moves = unique_moves(board, possible_moves)
+
+    # La clave es la canónica (compartida por las 8 versiones simétricas de la posición) e incluye
+    # a quién le toca mover; las puntuaciones se guardan desde su punto de vista (sign), de forma
+    # que una entrada sirve sea cual sea la marca del maximizador, y el mejor movimiento se guarda
+    # en la orientación canónica. Una entrada solo sirve si se buscó al menos a la profundidad
+    # que ahora hace falta.
+    position_key, orientation = canonical_key(board)
+    tt_key = position_key ^ ZOBRIST_TURN[mark]
+    sign = 1 if is_maximizing_turn else -1
+    tt_move = None
+    entry = board.tt.probe(tt_key)
+    if entry is not None:
+        if stats is not None:
+            stats.tt_hits += 1
+        if entry[4] is not None:
+            transforms, inverses = get_symmetries(board.n)
+            tt_move = transforms[inverses[orientation]][entry[4]]
+    if depth == 0:
+        # Orden natural en la raíz, salvo el movimiento de la tabla, que va primero
+        natural_order = {move: index for index, move in enumerate(possible_moves)}
+        if tt_move in natural_order:
+            possible_moves.remove(tt_move)
+            possible_moves.insert(0, tt_move)
+    else:
+        if entry is not None:
+            _, stored_score, bound, stored_depth, _ = entry
+            if stored_depth >= remaining_depth:
+                stored_score *= sign
+                bound = bound if sign > 0 else _flip_bound(bound)
+                if bound == Bound.LOWER:
+                    alpha = max(alpha, stored_score)
+                elif bound == Bound.UPPER:
+                    beta = min(beta, stored_score)
+                if bound == Bound.EXACT or alpha >= beta:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return stored_score, tt_move
+        possible_moves = order_moves(board, possible_moves, mark, other_mark, tt_move)
+    alpha_start, beta_start = alpha, beta # Ventana realmente buscada, para clasificar el resultado
+
+    best_move_at_this_level = None
+
+    if is_maximizing_turn: # Turno de la IA (quiere la puntuación más alta)
+        best_score = -math.inf
+        for index, move in enumerate(possible_moves):
+            wins_ties = depth == 0 and index > 0 and natural_order[move] < natural_order[best_move_at_this_level]
+            if alpha >= beta and not wins_ties: # Solo en la raíz: ya no puede mejorar ni empatar antes
+                continue
+            board.make_move(move, mark)
+            if index == 0:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, depth + 1, alpha, beta, *limits)
+            elif wins_ties:
+                # Basta con que iguale a alpha para sustituir al mejor movimiento actual
+                score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, depth + 1, alpha - NULL_WINDOW, beta, *limits)
+            else:
+                # Ventana nula: solo interesa saber si este movimiento supera a alpha
+                score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, depth + 1, alpha, alpha + NULL_WINDOW, *limits)
+                if alpha < score_of_resulting_state < beta:
+                    score_of_resulting_state, _ = minimax_alpha_beta(board, False, maximizer_mark, depth + 1, alpha, beta, *limits)
+            board.undo()
+            if depth == 0 and stats is not None:
+                stats.root_move(move, score_of_resulting_state)
+
+            if score_of_resulting_state > best_score or (wins_ties and score_of_resulting_state == best_score):
+                best_score = score_of_resulting_state
+                best_move_at_this_level = move
+            alpha = max(alpha, best_score)
+            # Poda: el minimizador nunca permitirá llegar a este nodo. En la raíz se siguen
+            # comprobando los movimientos anteriores en el orden natural, que ganan los empates.
+            if alpha >= beta and depth > 0:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+        _store_result(board, tt_key, sign, best_score, alpha_start, beta_start, remaining_depth, best_move_at_this_level, orientation)
+        return best_score, best_move_at_this_level
+
+    else: # Turno del oponente (quiere la puntuación más baja para la IA)
+        best_score = math.inf
+        for index, move in enumerate(possible_moves):
+            wins_ties = depth == 0 and index > 0 and natural_order[move] < natural_order[best_move_at_this_level]
+            if alpha >= beta and not wins_ties: # Solo en la raíz: ya no puede mejorar ni empatar antes
+                continue
+            board.make_move(move, mark)
+            if index == 0:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, depth + 1, alpha, beta, *limits)
+            elif wins_ties:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, depth + 1, alpha, beta + NULL_WINDOW, *limits)
+            else:
+                score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, depth + 1, beta - NULL_WINDOW, beta, *limits)
+                if alpha < score_of_resulting_state < beta:
+                    score_of_resulting_state, _ = minimax_alpha_beta(board, True, maximizer_mark, depth + 1, alpha, beta, *limits)
+            board.undo()
+            if depth == 0 and stats is not None:
+                stats.root_move(move, score_of_resulting_state)
+
+            if score_of_resulting_state < best_score or (wins_ties and score_of_resulting_state == best_score):
+                best_score = score_of_resulting_state
+                best_move_at_this_level = move
+            beta = min(beta, best_score)
+            if alpha >= beta and depth > 0: # Poda: el maximizador nunca permitirá llegar a este nodo
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+        _store_result(board, tt_key, sign, best_score, alpha_start, beta_start, remaining_depth, best_move_at_this_level, orientation)
+        return best_score, best_move_at_this_level
+
+def _store_result(board, tt_key, sign, score, alpha, beta, depth, best_move, orientation):
+    # Guarda en la tabla de transposición el resultado de un nodo buscado con la ventana [alpha, beta];
+    # el mejor movimiento se pasa a la orientación canónica de la posición
+    if score <= alpha:
+        bound = Bound.UPPER # Ningún movimiento superó a alpha: la puntuación real puede ser menor
+    elif score >= beta:
+        bound = Bound.LOWER # Se podó por beta: la puntuación real puede ser mayor
+    else:
+        bound = Bound.EXACT
+    if sign < 0:
+        bound = _flip_bound(bound)
+    if best_move is not None:
+        best_move = get_symmetries(board.n)[0][orientation][best_move]
+    board.tt.store(tt_key, score * sign, bound, depth, best_move)
+
+class SearchResult:
+    # Resultado de search_best_move
+    def __init__(self, move, score, depth, nodes, elapsed_ms, completed):
+        self.move = move             # Mejor movimiento encontrado
+        self.score = score           # Su puntuación (exacta si completed, heurística si no)
+        self.depth = depth           # Profundidad de la última iteración completada
+        self.nodes = nodes           # Nodos visitados en total
+        self.elapsed_ms = elapsed_ms # Tiempo empleado, en milisegundos
+        self.completed = completed   # True si se llegó hasta el final de la partida en todas las ramas
+
+    def __str__(self):
+        reach = "final de la partida" if self.completed else f"profundidad {self.depth}"
+        return f"{reach}, {self.nodes} nodos, {self.elapsed_ms:.0f} ms"
+
+def search_best_move(board, ai_mark, time_limit_ms=None, max_nodes=None, max_depth=None,
+                     heuristic=evaluate_open_lines, stats=None, use_book=True, cache=None, stop=None):
+    # Búsqueda "en cualquier momento" mediante profundización iterativa: busca a profundidad
+    # 1, 2, 3... hasta llegar al final de la partida (o a max_depth) o hasta agotar el tiempo
+    # (time_limit_ms) o el presupuesto de nodos (max_nodes), y devuelve un SearchResult con el
+    # mejor movimiento de la última profundidad completada. Cada iteración prueba primero el
+    # mejor movimiento de la anterior, que queda guardado en la tabla de transposición.
+    # La profundidad 1 siempre se completa, para tener al menos un movimiento.
+    # Si use_book y la posición está en el libro de aperturas, se responde sin buscar.
+    # stats: SearchStats opcional; su on_iteration se llama al completar cada profundidad
+    # cache: PositionCache opcional; se consulta antes de buscar y, si la búsqueda llega al final
+    #        de la partida, se guarda en ella el resultado
+    # stop: threading.Event opcional para interrumpir la búsqueda desde otro hilo, como al agotar el tiempo
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
+    start = time.perf_counter()
+    if use_book and max_depth is None:
+        entry = lookup_book_move(board, ai_mark)
+        if entry is not None:
+            stats.book_hits += 1
+            stats.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            return SearchResult(entry[0], entry[1], len(board.get_possible_moves()), 0, elapsed_ms, True)
+    if cache is not None:
+        entry = cache.lookup(board, ai_mark)
+        if entry is not None:
+            stats.cache_hits += 1
+            stats.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            return SearchResult(entry[0], entry[1], len(board.get_possible_moves()), 0, elapsed_ms, True)
+    start_nodes = stats.nodes
+    deadline = None if time_limit_ms is None else start + time_limit_ms / 1000
+    node_limit = None if max_nodes is None else stats.nodes + max_nodes
+    root_history = len(board.moves_history)
+    empty_squares = len(board.get_possible_moves())
+    last_depth = empty_squares if max_depth is None else min(max_depth, empty_squares)
+
+    best_move, best_score, reached_depth = None, None, 0
+    for depth_limit in range(1, last_depth + 1):
+        try:
+            best_score, best_move = minimax_alpha_beta(board, True, ai_mark, 0, stats=stats, max_depth=depth_limit, heuristic=heuristic,
+                                                       max_nodes=node_limit if depth_limit > 1 else None,
+                                                       deadline=deadline if depth_limit > 1 else None,
+                                                       stop=stop if depth_limit > 1 else None)
+            reached_depth = depth_limit
+            stats.iteration(depth_limit, best_move, best_score)
+        except SearchAborted:
+            # Deshace los movimientos que quedaron hechos al interrumpir la búsqueda
+            while len(board.moves_history) > root_history:
+                board.undo()
+            break
+    stats.stop()
+    # Si la partida ya había terminado no hay movimiento que guardar
+    if cache is not None and reached_depth == empty_squares and best_move is not None:
+        cache.store(board, ai_mark, best_move, best_score)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return SearchResult(best_move, best_score, reached_depth, stats.nodes - start_nodes, elapsed_ms, reached_depth == empty_squares)
+
+def get_best_move(board, ai_mark, use_alpha_beta=True, stats=None, max_depth=None, max_nodes=None,
+                  heuristic=evaluate_open_lines, time_limit_ms=None, workers=1, use_book=True, cache=None,
+                  use_mcts=False, playouts=None):
     # Encuentra el mejor movimiento para la IA en el estado actual del tablero
     # ai_mark: la marca de la IA
-    _, best_move = minimax(board, True, ai_mark, 0)
+    # use_alpha_beta: si es False se usa el minimax completo original
+    # stats: SearchStats opcional para obtener los contadores y el tiempo de la búsqueda
+    # max_depth: limita la búsqueda a esa profundidad y puntúa las hojas con 'heuristic'
+    # max_nodes, time_limit_ms: presupuesto de nodos o de tiempo; se usa search_best_move
+    #                           y se devuelve el mejor movimiento encontrado al agotarlo
+    # workers: número de procesos entre los que repartir los movimientos de la raíz
+    # use_book: consulta primero el libro de aperturas (solo en búsquedas sin max_depth)
+    # cache: PositionCache opcional con posiciones ya resueltas; se consulta antes de buscar (salvo
+    #        con max_depth) y en ella se guardan los resultados de las búsquedas hasta el final.
+    #        Entre movimientos igual de buenos puede devolver otro que el de la búsqueda.
+    # use_mcts: usa la búsqueda Monte Carlo (mcts_best_move) en lugar de minimax, para tableros
+    #           grandes; su presupuesto es playouts y/o time_limit_ms, y workers sus procesos.
+    #           No usa el libro, la caché, max_depth ni max_nodes. Cada llamada empieza un árbol
+    #           nuevo; para reutilizarlo entre turnos hay que llamar a mcts_best_move con trees.
+    if use_mcts:
+        return mcts_best_move(board, ai_mark, playouts, time_limit_ms, workers, stats=stats).move
+    if use_alpha_beta and (max_nodes is not None or time_limit_ms is not None):
+        if workers > 1:
+            raise ValueError("La búsqueda en paralelo no admite max_nodes ni time_limit_ms.")
+        # search_best_move consulta el libro y mide su propio tiempo
+        return search_best_move(board, ai_mark, time_limit_ms, max_nodes, max_depth, heuristic, stats, use_book, cache).move
+    if stats is not None:
+        stats.start()
+    entry = lookup_book_move(board, ai_mark) if use_alpha_beta and use_book and max_depth is None else None
+    cached = cache.lookup(board, ai_mark) if entry is None and cache is not None and max_depth is None else None
+    if not use_alpha_beta:
+        _, best_move = minimax(board, True, ai_mark, 0)
+    elif entry is not None:
+        best_move = entry[0]
+        if stats is not None:
+            stats.book_hits += 1
+    elif cached is not None:
+        best_move = cached[0]
+        if stats is not None:
+            stats.cache_hits += 1
+    else:
+        if workers > 1:
+            best_score, best_move = parallel_minimax(board, ai_mark, workers, max_depth, heuristic, stats)
+        else:
+            best_score, best_move = minimax_alpha_beta(board, True, ai_mark, 0, stats=stats, max_depth=max_depth, heuristic=heuristic)
+        if cache is not None and max_depth is None and best_move is not None:
+            cache.store(board, ai_mark, best_move, best_score)
+    if stats is not None:
+        stats.stop()
     return best_move
 
+# --- Libro de aperturas ---
+# Fichero binario con la jugada perfecta de las posiciones de los primeros movimientos de la
+# partida, resueltas hasta el final con minimax_alpha_beta. Cabecera (BOOK_HEADER): firma, n, k
+# y número de registros; después los registros (BOOK_RECORD) ordenados por clave: clave Zobrist
+# de la posición con el turno, casilla del mejor movimiento (r * n + c) y su puntuación para el
+# jugador al que le toca mover. Se guardan las 8 versiones simétricas de cada posición, cada una
+# con el movimiento que elegiría la búsqueda en esa orientación (el primero en orden natural
+# entre los mejores), así que el libro devuelve exactamente lo mismo que get_best_move.
+BOOK_MAGIC = b"TTTB"
+BOOK_HEADER = struct.Struct("<4sBBI")
+BOOK_RECORD = struct.Struct("<QBb")
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ticTacToe-4x4.book")
+DEFAULT_BOOK_PLIES = 3 # Movimientos desde el tablero vacío que cubre el libro por defecto
+
+class OpeningBook:
+    # Libro de aperturas mapeado en memoria; cada consulta es una búsqueda binaria en el fichero
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n, self.k, self.count = BOOK_HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC or len(self.data) != BOOK_HEADER.size + self.count * BOOK_RECORD.size:
+            self.data.close()
+            raise ValueError(f"{path} no es un libro de aperturas válido.")
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, key):
+        # Devuelve (casilla, puntuación) de la posición con clave 'key', o None si no está
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record_key, cell, score = BOOK_RECORD.unpack_from(self.data, BOOK_HEADER.size + middle * BOOK_RECORD.size)
+            if record_key == key:
+                return cell, score
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+_opening_books = {} # Libros ya abiertos (o None si no se pudieron abrir), por ruta
+
+def get_opening_book(path=OPENING_BOOK_PATH):
+    # Abre el libro la primera vez que se necesita. Devuelve None si no está disponible.
+    if path not in _opening_books:
+        try:
+            _opening_books[path] = OpeningBook(path)
+        except (OSError, ValueError, struct.error): # No existe, está vacío o no es un libro
+            _opening_books[path] = None
+    return _opening_books[path]
+
+def lookup_book_move(board, mark, path=OPENING_BOOK_PATH):
+    # Devuelve (movimiento, puntuación para 'mark') si la posición está en el libro, o None
+    book = get_opening_book(path)
+    if book is None or book.n != board.n or book.k != board.k:
+        return None
+    entry = book.lookup(board.zobrist_key ^ ZOBRIST_TURN[mark])
+    if entry is None:
+        return None
+    cell, score = entry
+    return (cell // board.n, cell % board.n), score
+
+def build_opening_book(n=4, k=None, plies=DEFAULT_BOOK_PLIES, path=OPENING_BOOK_PATH, backend="bitboard"):
+    # Resuelve las posiciones alcanzables en 'plies' movimientos o menos (empiece quien empiece)
+    # y escribe el libro en 'path'. Devuelve el número de registros.
+    board = BOARD_BACKENDS[backend](n, k=k)
+    transforms, _ = get_symmetries(n)
+    records = {}
+    solved = set() # Claves canónicas (con el turno) ya resueltas
+
+    def visit(mark, ply):
+        if board.get_state() != State.PLAYING:
+            return
+        canonical = canonical_key(board)[0] ^ ZOBRIST_TURN[mark]
+        if canonical in solved:
+            return
+        solved.add(canonical)
+        other_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+
+        # Puntuación exacta de cada movimiento para 'mark'; la tabla de transposición del tablero
+        # se comparte entre todas las búsquedas
+        scores = {}
+        for move in board.get_possible_moves():
+            board.make_move(move, mark)
+            if board.get_state() == State.PLAYING:
+                scores[move] = -minimax_alpha_beta(board, True, other_mark, 0)[0]
+            else:
+                scores[move] = evaluate_board(board, mark)
+            board.undo()
+        best_score = max(scores.values())
+        best_moves = [move for move in scores if scores[move] == best_score]
+        for index, transform in enumerate(transforms):
+            move = min(transform[move] for move in best_moves) # Primero en orden natural en esa orientación
+            records[board.sym_keys[index] ^ ZOBRIST_TURN[mark]] = (move[0] * n + move[1], best_score)
+
+        if ply < plies:
+            for move in unique_moves(board, board.get_possible_moves()):
+                board.make_move(move, mark)
+                visit(other_mark, ply + 1)
+                board.undo()
+
+    visit(PLAYER_X, 0)
+    visit(PLAYER_O, 0)
+    with open(path, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, n, board.k, len(records)))
+        for key in sorted(records):
+            f.write(BOOK_RECORD.pack(key, *records[key]))
+    _opening_books.pop(path, None) # La próxima consulta abre el libro nuevo
+    return len(records)
+
+# --- Caché persistente de posiciones resueltas ---
+
+DEFAULT_CACHE_BATCH = 256 # Resultados que se acumulan en memoria antes de escribirlos en la base de datos
+
+class PositionCache:
+    # Caché en disco (SQLite) de posiciones resueltas hasta el final de la partida: para cada
+    # posición (tamaño, k y clave canónica con el turno) guarda el mejor movimiento, en la
+    # orientación canónica, y su puntuación para el jugador al que le toca mover. Sobrevive a los
+    # reinicios y la pueden leer a la vez varios procesos (modo WAL); las escrituras se agrupan
+    # en transacciones de 'batch_size' resultados. Cada proceso abre su propia conexión.
+    def __init__(self, path, batch_size=DEFAULT_CACHE_BATCH):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = {} # Resultados aún no escritos: (n, k, clave) -> (casilla, puntuación)
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self):
+        # Las conexiones de SQLite no se pueden compartir entre procesos: se abre una en cada uno
+        if self._connection is None or self._pid != os.getpid():
+            import sqlite3 # Ver el comienzo del fichero: solo se importa si se usa la caché
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._pid = os.getpid()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS positions (n INTEGER, k INTEGER, key INTEGER, "
+                                     "cell INTEGER, score REAL, PRIMARY KEY (n, k, key)) WITHOUT ROWID")
+        return self._connection
+
+    @staticmethod
+    def _key(board, mark):
+        # Clave canónica con el turno como entero con signo de 64 bits (el tipo de SQLite),
+        # y la simetría que lleva el tablero a su orientación canónica
+        key, orientation = canonical_key(board)
+        key ^= ZOBRIST_TURN[mark]
+        return (key - (1 << 64) if key >= 1 << 63 else key), orientation
+
+    def lookup(self, board, mark):
+        # Devuelve (movimiento, puntuación para 'mark') si la posición está en la caché, o None
+        key, orientation = self._key(board, mark)
+        row = self.pending.get((board.n, board.k, key))
+        if row is None:
+            row = self.connection.execute("SELECT cell, score FROM positions WHERE n = ? AND k = ? AND key = ?",
+                                          (board.n, board.k, key)).fetchone()
+        if row is None:
+            return None
+        cell, score = row
+        transforms, inverses = get_symmetries(board.n)
+        return transforms[inverses[orientation]][divmod(cell, board.n)], score
+
+    def store(self, board, mark, move, score):
+        # Añade el resultado exacto de una posición; se escribe al acumular batch_size o con flush
+        key, orientation = self._key(board, mark)
+        r, c = get_symmetries(board.n)[0][orientation][move]
+        self.pending[(board.n, board.k, key)] = (r * board.n + c, score)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?, ?)",
+                                            [key + row for key, row in self.pending.items()])
+            self.pending = {}
+
+    def __len__(self):
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+# --- Evaluación por lotes ---
+
+_batch_boards = {} # Tablero de trabajo (con su tabla de transposición) de cada configuración de get_best_moves
+
+def _line_matrix(n, k):
+    # Matriz de incidencia líneas x casillas (casilla r * n + c) de un tablero n x n con k en raya
+    lines, _ = build_lines(n, k)
+    matrix = np.zeros((len(lines), n * n), dtype=np.int16)
+    for index, line in enumerate(lines):
+        for r, c in line:
+            matrix[index, r * n + c] = 1
+    return matrix
+
+def _winning_cells(own, opponent, matrix, k):
+    # Matriz booleana tableros x casillas: casillas vacías que completan una línea de 'own'
+    # (casillas propias, 0/1) sin marcas de 'opponent'
+    own_counts = own @ matrix.T
+    opponent_counts = opponent @ matrix.T
+    winning_lines = ((own_counts == k - 1) & (opponent_counts == 0)).astype(np.int16)
+    return (winning_lines @ matrix > 0) & (own + opponent == 0)
+
+def _first_cells(cells, n):
+    # Primera casilla marcada (en orden natural) de cada fila de 'cells', o None
+    return [divmod(int(cell), n) if found else None for cell, found in zip(cells.argmax(axis=1), cells.any(axis=1))]
+
+def _stack_boards(boards, marks):
+    # Apila los tableros en dos matrices tableros x casillas: casillas de quien mueve y del oponente
+    grids = np.array([[cell for row in board.board for cell in row] for board in boards])
+    own = (grids == np.array(marks)[:, None]).astype(np.int16)
+    occupied = (grids != ' ').astype(np.int16)
+    return own, occupied - own
+
+def find_immediate_wins(boards, marks):
+    # Versión vectorizada con NumPy de la búsqueda de victorias inmediatas para un grupo de tableros
+    # del mismo tamaño y k: apila los tableros en dos matrices (casillas propias y del oponente de
+    # quien mueve), cuenta las marcas de cada línea con un producto de matrices y devuelve, para cada
+    # tablero, la primera casilla vacía (en orden natural) que completa una línea, o None
+    _require_numpy()
+    n, k = boards[0].n, boards[0].k
+    own, opponent = _stack_boards(boards, marks)
+    return _first_cells(_winning_cells(own, opponent, _line_matrix(n, k), k), n)
+
+def find_forced_moves(boards, marks):
+    # Como find_immediate_wins, pero si quien mueve no puede ganar ya y el oponente sí podría en
+    # su turno, devuelve la primera casilla (en orden natural) que lo bloquea: cualquier otro
+    # movimiento pierde. Si el oponente amenaza dos casillas la partida está perdida igualmente.
+    _require_numpy()
+    n, k = boards[0].n, boards[0].k
+    own, opponent = _stack_boards(boards, marks)
+    matrix = _line_matrix(n, k)
+    wins = _winning_cells(own, opponent, matrix, k)
+    blocks = _winning_cells(opponent, own, matrix, k)
+    can_win = wins.any(axis=1)[:, None]
+    return _first_cells(np.where(can_win, wins, blocks), n)
+
+def get_best_moves(boards, ai_marks, vectorized=False, use_book=True, stats=None, max_depth=None, max_nodes=None,
+                   heuristic=evaluate_open_lines, time_limit_ms=None):
+    # Versión por lotes de get_best_move, para atender muchas partidas a la vez: recibe una lista
+    # de tableros y la marca de la IA en cada uno (o una sola marca para todos) y devuelve la lista
+    # de movimientos. Frente a llamar a get_best_move con cada tablero:
+    # - Las posiciones repetidas se buscan una sola vez, y las equivalentes por giro o reflexión
+    #   se buscan seguidas para aprovechar la tabla de transposición. Cada tablero recibe el mismo
+    #   movimiento que le daría get_best_move, sea cual sea el resto del lote.
+    # - Todas las búsquedas usan un mismo tablero de trabajo por tamaño, k y heurística. Si buscan
+    #   hasta el final de la partida, su tabla de transposición se conserva entre posiciones del
+    #   lote y entre lotes (sus valores son exactos). Con max_depth, max_nodes o time_limit_ms se
+    #   vacía antes de cada grupo de posiciones equivalentes, porque un valor guardado a otra
+    #   profundidad cambiaría el resultado frente a get_best_move.
+    # - Con vectorized=True (requiere NumPy) las victorias inmediatas y los bloqueos obligados de
+    #   todo el lote se detectan a la vez con operaciones de matrices (find_forced_moves) y se
+    #   responden sin buscar. Cuánto ahorra depende de cuántas posiciones del lote los tengan, y
+    #   entre varios movimientos igual de buenos puede elegir otro que el de get_best_move.
+    # El resto de opciones son las de get_best_move; time_limit_ms y max_nodes son por posición.
+    if isinstance(ai_marks, str):
+        ai_marks = [ai_marks] * len(boards)
+    if vectorized and not HAVE_NUMPY:
+        raise ValueError("vectorized=True requiere NumPy, que no está instalado.")
+    moves = [None] * len(boards)
+    pending = [index for index, board in enumerate(boards) if board.get_state() == State.PLAYING]
+
+    if vectorized:
+        groups = {}
+        for index in pending:
+            groups.setdefault((boards[index].n, boards[index].k), []).append(index)
+        for indices in groups.values():
+            forced = find_forced_moves([boards[index] for index in indices], [ai_marks[index] for index in indices])
+            for index, move in zip(indices, forced):
+                moves[index] = move
+        pending = [index for index in pending if moves[index] is None]
+
+    # Agrupa las posiciones repetidas (misma clave Zobrist y mismo turno): se busca una vez cada una.
+    # Las equivalentes por simetría se buscan seguidas, cada una en su orientación, para que el
+    # movimiento no dependa del resto del lote; la tabla de transposición usa claves canónicas,
+    # así que tras la primera del grupo las demás se resuelven casi sin buscar.
+    unique = {}
+    for index in pending:
+        board = boards[index]
+        turn = ZOBRIST_TURN[ai_marks[index]]
+        canonical = (board.n, board.k, canonical_key(board)[0] ^ turn)
+        unique.setdefault(canonical, {}).setdefault(board.sym_keys[0] ^ turn, []).append(index)
+
+    exact = max_depth is None and max_nodes is None and time_limit_ms is None
+    for (n, k, _), positions in unique.items():
+        config = (n, k, heuristic)
+        work_board = _batch_boards.get(config)
+        if work_board is None:
+            work_board = _batch_boards[config] = BitTicTacBoard(n, k=k)
+        if not exact:
+            work_board.tt.clear()
+        for members in positions.values():
+            while work_board.moves_history:
+                work_board.undo()
+            source = boards[members[0]]
+            for move in source.moves_history:
+                work_board.make_move(move, source.board[move[0]][move[1]])
+            move = get_best_move(work_board, ai_marks[members[0]], stats=stats, max_depth=max_depth, max_nodes=max_nodes,
+                                 heuristic=heuristic, time_limit_ms=time_limit_ms, use_book=use_book)
+            for index in members:
+                moves[index] = move
+    return moves
+
+# --- Búsqueda en paralelo ---
+
+_executors = {}            # Grupos de procesos ya creados, por número de procesos
+_search_ids = itertools.count() # Identificador de cada búsqueda en paralelo
+_worker_state = {"search_id": None, "board": None} # Tablero propio de cada proceso trabajador
+
+def _get_executor(workers):
+    # Devuelve (creándolo la primera vez) un grupo de 'workers' procesos. Se reutiliza entre
+    # búsquedas para no pagar el arranque de los procesos en cada movimiento.
+    if workers not in _executors:
+        import multiprocessing # Ver el comienzo del fichero: solo se importan si se busca en paralelo
+        from concurrent.futures import ProcessPoolExecutor
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork") if "fork" in methods else None
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return _executors[workers]
+
+def _search_root_move(task):
+    # Se ejecuta en un proceso trabajador: busca un movimiento de la raíz con la ventana dada y
+    # devuelve (puntuación, SearchStats de la tarea). Como make_move/undo modifican el tablero, cada proceso usa
+    # su propia copia, reconstruida a partir de la secuencia de movimientos. La copia (y su tabla
+    # de transposición) se reutiliza entre tareas de una misma búsqueda y se descarta al empezar
+    # otra, para que el resultado no dependa de qué proceso recibió cada tarea.
+    search_id, board_class, n, k, tt_max_entries, tt_policy, history, ai_mark, move, alpha, beta, max_depth, heuristic = task
+    board = _worker_state["board"]
+    if _worker_state["search_id"] != search_id:
+        board = board_class(n, tt_max_entries, tt_policy, k)
+        _worker_state["search_id"], _worker_state["board"] = search_id, board
+    else:
+        while board.moves_history:
+            board.undo()
+    for played_move, mark in history:
+        board.make_move(played_move, mark)
+    board.make_move(move, ai_mark)
+    stats = SearchStats()
+    stats.nodes_by_depth = [0] # La raíz (profundidad 0) se cuenta en el proceso principal
+    score, _ = minimax_alpha_beta(board, False, ai_mark, 1, alpha, beta, stats, max_depth, heuristic)
+    return score, stats
+
+'''
+    --- Búsqueda en paralelo repartiendo la raíz ---
+    Cada movimiento de la raíz es independiente, así que se reparten entre varios procesos
+    (cada uno con su propia copia del tablero). Siguiendo la idea de "Young Brothers Wait",
+    el primer movimiento (el hermano mayor) se busca antes, en este proceso, con la ventana
+    completa; su puntuación sirve de alpha para el resto, que se buscan en paralelo.
+    Los resultados se recorren en el orden natural de los movimientos y un movimiento solo
+    sustituye al mejor si lo supera estrictamente, así que se elige el mismo movimiento que
+    en la búsqueda en serie: siempre en búsquedas hasta el final de la partida, y en las de
+    profundidad limitada siempre que la tabla de transposición del tablero esté vacía (una
+    tabla con búsquedas anteriores más profundas puede mejorar la puntuación en serie).
+'''
+def parallel_minimax(board, ai_mark, workers, max_depth=None, heuristic=evaluate_open_lines, stats=None):
+    # Devuelve (puntuación, movimiento) como minimax_alpha_beta en la raíz
+    # workers: número de procesos; max_depth y heuristic: como en minimax_alpha_beta
+    # stats: SearchStats opcional donde se suman los contadores de todos los procesos
+    possible_moves = unique_moves(board, board.get_possible_moves())
+    if stats is None:
+        stats = SearchStats()
+    if len(possible_moves) <= 1 or board.get_state() != State.PLAYING:
+        return minimax_alpha_beta(board, True, ai_mark, 0, stats=stats, max_depth=max_depth, heuristic=heuristic)
+
+    stats.nodes += 1 # La raíz
+    if stats.nodes_by_depth:
+        stats.nodes_by_depth[0] += 1
+    else:
+        stats.nodes_by_depth.append(1)
+    eldest = possible_moves[0]
+    board.make_move(eldest, ai_mark)
+    best_score, _ = minimax_alpha_beta(board, False, ai_mark, 1, -WIN_SCORE, WIN_SCORE, stats, max_depth, heuristic)
+    board.undo()
+    stats.root_move(eldest, best_score)
+    best_move = eldest
+    if best_score >= WIN_SCORE: # No se puede mejorar una victoria
+        return best_score, best_move
+
+    history = [(move, board.board[move[0]][move[1]]) for move in board.moves_history]
+    search_id = (id(board), next(_search_ids))
+    tasks = [(search_id, type(board), board.n, board.k, board.tt.max_entries, board.tt.policy, history, ai_mark,
+              move, best_score, WIN_SCORE, max_depth, heuristic) for move in possible_moves[1:]]
+    results = _get_executor(workers).map(_search_root_move, tasks)
+    for move, (score, move_stats) in zip(possible_moves[1:], results):
+        stats.merge(move_stats)
+        stats.root_move(move, score)
+        if score > best_score:
+            best_score, best_move = score, move
+    return best_score, best_move
+
+def benchmark_parallel(n=4, opening_moves=1, worker_counts=(1, 2, 4, 8)):
+    # Mide cuánto tarda la búsqueda completa de una posición fija de n x n (tras 'opening_moves'
+    # movimientos en orden natural) con distintos números de procesos, y comprueba que todas
+    # devuelven el mismo movimiento que la búsqueda en serie
+    def opening_board():
+        board = BitTicTacBoard(n)
+        mark = PLAYER_X
+        for move in board.get_possible_moves()[:opening_moves]:
+            board.make_move(move, mark)
+            mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+        return board, mark
+
+    board, mark = opening_board()
+    start = time.perf_counter()
+    serial_score, serial_move = minimax_alpha_beta(board, True, mark, 0)
+    serial_time = time.perf_counter() - start
+    print(f"Tablero {n}x{n} tras {opening_moves} movimientos, {os.cpu_count()} CPU disponibles")
+    print(f"{'Procesos':>8} {'Segundos':>9} {'Aceleración':>12} {'Nodos':>9}  Movimiento")
+    print(f"{'serie':>8} {serial_time:>9.3f} {1:>12.2f} {'':>9}  {serial_move}")
+    results = []
+    for workers in worker_counts:
+        board, mark = opening_board() # Tabla de transposición vacía en cada prueba
+        _get_executor(workers) # Arranca los procesos antes de medir
+        stats = SearchStats()
+        start = time.perf_counter()
+        score, move = parallel_minimax(board, mark, workers, stats=stats)
+        elapsed = time.perf_counter() - start
+        if (score, move) != (serial_score, serial_move):
+            raise AssertionError(f"La búsqueda con {workers} procesos devolvió {move} en lugar de {serial_move}")
+        print(f"{workers:>8} {elapsed:>9.3f} {serial_time / elapsed:>12.2f} {stats.nodes:>9}  {move}")
+        results.append((workers, elapsed, stats.nodes))
+    return results
+
+# --- Búsqueda Monte Carlo (MCTS) ---
+
+MCTS_EXPLORATION = 0.5       # Constante de exploración de UCT: más alta explora más, más baja explota más
+MCTS_NEIGHBORHOOD = 1        # En el árbol solo se prueban casillas a esta distancia (o menos) de alguna marca
+MCTS_WIDENING = 1.5          # Un nodo con v visitas puede tener hasta MCTS_WIDENING * raíz(v) hijos
+MCTS_HEURISTIC_WEIGHT = 0.5  # Peso de la heurística de líneas abiertas frente al resultado de la simulación
+DEFAULT_MCTS_PLAYOUTS = 5000 # Partidas simuladas por movimiento si no se da otro presupuesto
+
+_mcts_tables = {} # Máscaras precalculadas de cada tamaño y k
+
+def _get_mcts_tables(n, k):
+    # Devuelve (máscaras de las líneas, máscaras de las líneas de cada casilla, vecindad de cada
+    # casilla); la casilla (r, c) es el bit r * n + c, como en BitTicTacBoard
+    if (n, k) not in _mcts_tables:
+        lines, lines_by_cell = build_lines(n, k)
+        line_masks = [sum(1 << (r * n + c) for r, c in line) for line in lines]
+        masks_by_bit = [[line_masks[index] for index in lines_by_cell[(r, c)]] for r in range(n) for c in range(n)]
+        radius = MCTS_NEIGHBORHOOD
+        neighborhood = [sum(1 << (nr * n + nc) for nr in range(max(0, r - radius), min(n, r + radius + 1))
+                            for nc in range(max(0, c - radius), min(n, c + radius + 1)))
+                        for r in range(n) for c in range(n)]
+        _mcts_tables[(n, k)] = (line_masks, masks_by_bit, neighborhood)
+    return _mcts_tables[(n, k)]
+
+class MCTSNode:
+    # Nodo del árbol de MCTS: la posición a la que se llega jugando 'move' (bit de la casilla)
+    # con la marca 'mark' desde la del nodo padre
+    __slots__ = ("move", "mark", "parent", "children", "untried", "visits", "wins", "result")
+
+    def __init__(self, move, mark, parent):
+        self.move = move
+        self.mark = mark
+        self.parent = parent
+        self.children = []
+        self.untried = None # Movimientos aún sin nodo hijo; se calculan al expandir el nodo por primera vez
+        self.visits = 0
+        self.wins = 0.0     # Suma de los valores (entre 0 y 1) de las simulaciones para 'mark'
+        self.result = None  # En posiciones terminales, el resultado para 'mark': 1 si gana y 0.5 si es empate
+
+class MCTSTree:
+    # Árbol de búsqueda Monte Carlo (UCT) de una posición. No usa el tablero de la partida: trabaja
+    # sobre una copia compacta, una máscara de bits por jugador, tanto al bajar por el árbol como
+    # en las partidas simuladas.
+    # - Selección: se baja por el hijo con mejor UCT (valor medio + exploration * raíz de
+    #   log(visitas del padre) / visitas del hijo) mientras el nodo no admita más hijos: con
+    #   ensanchamiento progresivo, un nodo con v visitas tiene como mucho MCTS_WIDENING * raíz(v).
+    # - Expansión: se crea un hijo con el movimiento más prometedor (según la prioridad de
+    #   order_moves) de los que aún no tienen nodo. Si el jugador puede ganar ya, solo se
+    #   considera esa victoria; si no, pero el oponente amenaza ganar, solo los bloqueos; y si
+    #   no, las casillas vacías junto a alguna marca (a distancia MCTS_NEIGHBORHOOD).
+    # - Simulación: se juega el resto de la partida al azar (salvo victorias y bloqueos
+    #   inmediatos) y el resultado se mezcla con la heurística de líneas abiertas de la hoja.
+    # - Retropropagación: se suma el valor en todos los nodos del camino, desde el punto de
+    #   vista de quien hizo cada movimiento.
+    def __init__(self, n, k, history, mark, exploration=MCTS_EXPLORATION):
+        # history: [(bit, marca)] desde el tablero vacío hasta la posición; mark: a quién le toca
+        self.n, self.k = n, k
+        self.exploration = exploration
+        self.line_masks, self.masks_by_bit, self.neighborhood = _get_mcts_tables(n, k)
+        self.weights = line_weights(k)
+        self.full_mask = (1 << (n * n)) - 1
+        self.history = list(history)
+        self.bits = {PLAYER_X: 0, PLAYER_O: 0}
+        for bit, played_mark in self.history:
+            self.bits[played_mark] |= 1 << bit
+        # La raíz guarda como 'mark' a quien hizo el último movimiento, como el resto de nodos
+        self.root = MCTSNode(None, PLAYER_O if mark == PLAYER_X else PLAYER_X, None)
+        self.max_depth = 0
+
+    def advance(self, history, mark):
+        # Reutiliza el árbol para una posición posterior: si 'history' empieza por la de la raíz y
+        # el árbol contiene los movimientos jugados desde entonces, su nodo pasa a ser la raíz y
+        # se conserva su subárbol. Devuelve False (y el árbol no cambia) si no es así o si en esa
+        # posición no le toca mover a 'mark'.
+        if history[:len(self.history)] != self.history:
+            return False
+        node = self.root
+        for bit, played_mark in history[len(self.history):]:
+            node = next((child for child in node.children if child.move == bit and child.mark == played_mark), None)
+            if node is None:
+                return False
+        if node.mark == mark:
+            return False
+        for bit, played_mark in history[len(self.history):]:
+            self.bits[played_mark] |= 1 << bit
+        self.history = list(history)
+        node.parent = None # El resto del árbol ya no se necesita
+        self.root = node
+        self.max_depth = 0
+        return True
+
+    def _winning_cells(self, own, opponent):
+        # Casillas vacías (como máscara) que completan una línea de 'own'
+        cells = 0
+        k = self.k
+        if own.bit_count() < k - 1:
+            return cells
+        for mask in self.line_masks:
+            if not opponent & mask and (own & mask).bit_count() == k - 1:
+                cells |= mask & ~own
+        return cells
+
+    def candidate_moves(self, own, opponent):
+        # Movimientos que se consideran en un nodo en el que mueve el dueño de 'own' (ver la clase)
+        empty = self.full_mask & ~(own | opponent)
+        cells = self._winning_cells(own, opponent)
+        if cells:
+            return [(cells & -cells).bit_length() - 1] # Con una victoria basta
+        cells = self._winning_cells(opponent, own)
+        if not cells:
+            occupied = own | opponent
+            if not occupied:
+                return [(self.n // 2) * self.n + self.n // 2] # Tablero vacío: el centro
+            near = 0
+            while occupied:
+                lowest = occupied & -occupied
+                near |= self.neighborhood[lowest.bit_length() - 1]
+                occupied ^= lowest
+            cells = near & empty
+        moves = []
+        while cells:
+            lowest = cells & -cells
+            moves.append(lowest.bit_length() - 1)
+            cells ^= lowest
+        # De peor a mejor, para que la expansión saque con pop() primero los más prometedores
+        moves.sort(key=lambda index: self._priority(index, own, opponent))
+        return moves
+
+    def _line_score(self, own, opponent):
+        # Suma de los pesos de las líneas abiertas de 'own', como board.line_score
+        weights = self.weights
+        score = 0
+        for mask in self.line_masks:
+            if not opponent & mask:
+                score += weights[(own & mask).bit_count()]
+        return score
+
+    def _priority(self, index, own, opponent):
+        # Prioridad de la casilla 'index' para el dueño de 'own', como en order_moves: suma lo que
+        # aporta a sus líneas abiertas y lo que quita a las del oponente
+        score = 0
+        for mask in self.masks_by_bit[index]:
+            mine = (own & mask).bit_count()
+            theirs = (opponent & mask).bit_count()
+            if not theirs:
+                score += 1 + mine * mine
+            elif not mine:
+                score += theirs * theirs
+        return score
+
+    def _playout(self, bits, mark, rng):
+        # Termina la partida y devuelve la marca ganadora o None (empate). Cada jugador gana si puede
+        # hacerlo con un movimiento, si no bloquea la victoria inmediata del otro y si no, mueve al
+        # azar: así las amenazas de la posición se resuelven en la simulación como en una partida real.
+        # Las casillas que dan la victoria a cada jugador (threats) se actualizan tras cada movimiento
+        # con las líneas que pasan por la casilla.
+        other_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+        own, other = bits[mark], bits[other_mark]
+        threats, other_threats = self._winning_cells(own, other), self._winning_cells(other, own)
+        empty = self.full_mask & ~(own | other)
+        cells = [index for index in range(self.n * self.n) if empty >> index & 1]
+        masks_by_bit = self.masks_by_bit
+        k = self.k
+        rand = rng.random
+        remaining = len(cells)
+        while empty:
+            if threats & empty:
+                return mark
+            forced = other_threats & empty
+            if forced:
+                index = (forced & -forced).bit_length() - 1
+            else:
+                # Casilla al azar entre las que quedan; la última ocupa su lugar (sin barajar toda
+                # la lista). Las que ya ocupó un bloqueo se descartan al salir.
+                while True:
+                    position = int(rand() * remaining)
+                    remaining -= 1
+                    index = cells[position]
+                    cells[position] = cells[remaining]
+                    if empty >> index & 1:
+                        break
+            bit = 1 << index
+            own |= bit
+            empty ^= bit
+            for mask in masks_by_bit[index]:
+                if not other & mask and (own & mask).bit_count() == k - 1:
+                    threats |= mask & ~own
+            own, other, threats, other_threats = other, own, other_threats, threats
+            mark, other_mark = other_mark, mark
+        return None
+
+    def run(self, playouts=None, deadline=None, rng=None, stats=None, stop=None):
+        # Hace iteraciones (selección, expansión, simulación y retropropagación) hasta completar
+        # 'playouts', llegar a 'deadline' (time.perf_counter()) o activarse 'stop' (threading.Event).
+        # Devuelve las iteraciones hechas.
+        rng = rng or random.Random()
+        exploration = self.exploration
+        iterations = 0
+        while (playouts is None or iterations < playouts) and \
+              (iterations % 16 or ((deadline is None or time.perf_counter() < deadline) and not (stop and stop.is_set()))):
+            iterations += 1
+            node = self.root
+            bits = dict(self.bits)
+            depth = 0
+            # Selección: mientras el nodo no pueda tener más hijos (ensanchamiento progresivo)
+            while node.result is None and node.untried is not None and \
+                  (not node.untried or len(node.children) >= MCTS_WIDENING * math.sqrt(node.visits)):
+                log_visits = math.log(node.visits)
+                node = max(node.children, key=lambda child: child.wins / child.visits
+                           + exploration * math.sqrt(log_visits / child.visits))
+                bits[node.mark] |= 1 << node.move
+                depth += 1
+            # Expansión
+            if node.result is None:
+                mark = PLAYER_O if node.mark == PLAYER_X else PLAYER_X
+                other = node.mark
+                if node.untried is None:
+                    node.untried = self.candidate_moves(bits[mark], bits[other])
+                move = node.untried.pop()
+                child = MCTSNode(move, mark, node)
+                node.children.append(child)
+                node = child
+                bits[mark] |= 1 << move
+                depth += 1
+                if any(bits[mark] & mask == mask for mask in self.masks_by_bit[move]):
+                    child.result = 1.0
+                elif bits[PLAYER_X] | bits[PLAYER_O] == self.full_mask:
+                    child.result = 0.5
+            self.max_depth = max(self.max_depth, depth)
+            # Simulación: resultado para quien hizo el último movimiento (node.mark)
+            if node.result is not None:
+                value = node.result
+            else:
+                other = PLAYER_O if node.mark == PLAYER_X else PLAYER_X
+                winner = self._playout(bits, other, rng)
+                value = 0.5 if winner is None else (1.0 if winner == node.mark else 0.0)
+                if MCTS_HEURISTIC_WEIGHT:
+                    # Se mezcla con la heurística de evaluate_open_lines (llevada a [0, 1]) en la
+                    # posición de la hoja, que reduce el ruido de una sola partida al azar
+                    difference = self._line_score(bits[node.mark], bits[other]) - self._line_score(bits[other], bits[node.mark])
+                    estimate = 0.5 + 0.5 * difference / (abs(difference) + HEURISTIC_SCALE)
+                    value = (1 - MCTS_HEURISTIC_WEIGHT) * value + MCTS_HEURISTIC_WEIGHT * estimate
+                if stats is not None:
+                    stats.evaluations += 1
+            # Retropropagación: el valor cambia de punto de vista en cada nivel
+            while node is not None:
+                node.visits += 1
+                node.wins += value
+                value = 1.0 - value
+                node = node.parent
+        if stats is not None:
+            stats.nodes += iterations
+        return iterations
+
+    def root_counts(self):
+        # {bit: [visitas, valor acumulado]} de los hijos de la raíz, para sumar los de varios árboles
+        return {child.move: [child.visits, child.wins] for child in self.root.children}
+
+def _mcts_worker(task):
+    # Se ejecuta en un proceso trabajador: construye su propio árbol de la posición, con otra
+    # semilla, y devuelve las visitas de la raíz y sus contadores
+    n, k, history, mark, playouts, time_limit_s, exploration, seed = task
+    tree = MCTSTree(n, k, history, mark, exploration)
+    stats = SearchStats()
+    deadline = None if time_limit_s is None else time.perf_counter() + time_limit_s
+    tree.run(playouts, deadline, random.Random(seed), stats)
+    return tree.root_counts(), stats
+
+'''
+    --- Búsqueda Monte Carlo en árbol (MCTS) ---
+    Alternativa a minimax para tableros grandes (7x7 a 15x15 con k en raya), donde la búsqueda
+    exhaustiva no llega ni con poda: en lugar de puntuar todas las respuestas, estima el valor
+    de cada movimiento con partidas al azar y dedica más simulaciones a los más prometedores.
+    La calidad depende del presupuesto (playouts o time_limit_ms) y no de la profundidad, así
+    que el tiempo de respuesta está acotado sea cual sea el tamaño del tablero.
+    - El árbol se puede reutilizar entre turnos: quien llama guarda sus árboles en un diccionario
+      (trees) y, si la partida es continuación de la última búsqueda del mismo tamaño y k, se
+      sigue desde el subárbol de los movimientos jugados. Cada partida (y cada motor) debe usar
+      su propio diccionario, para que un árbol no herede simulaciones de otro presupuesto.
+    - Con workers > 1 se paraleliza por la raíz: cada proceso construye su propio árbol
+      (con otra semilla) y se suman las visitas de cada movimiento de la raíz.
+    - Se elige el movimiento más visitado. Si solo hay un candidato (una victoria inmediata, el
+      único bloqueo de la del oponente o el centro del tablero vacío) se juega sin simular.
+'''
+def mcts_best_move(board, ai_mark, playouts=None, time_limit_ms=None, workers=1, exploration=MCTS_EXPLORATION,
+                   seed=None, stats=None, trees=None, stop=None):
+    # Devuelve un SearchResult con el movimiento elegido; su puntuación es su valor medio estimado
+    # llevado a [-1, 1] y su profundidad, la máxima alcanzada en el árbol
+    # playouts: simulaciones por árbol (por proceso); time_limit_ms: tiempo máximo. Sin ninguno de
+    #           los dos se hacen DEFAULT_MCTS_PLAYOUTS simulaciones.
+    # workers: procesos (el actual incluido) que construyen árboles independientes
+    # seed: semilla de las simulaciones, para repetir una búsqueda
+    # trees: diccionario de quien llama donde se guarda el último árbol de cada tamaño y k para
+    #        reutilizarlo (ver arriba); None para empezar siempre un árbol nuevo
+    # stats: SearchStats opcional; nodes cuenta iteraciones y evaluations, simulaciones
+    # stop: threading.Event opcional que interrumpe la búsqueda (en este proceso) como al agotar el tiempo
+    if stats is None:
+        stats = SearchStats()
+    stats.start()
+    start = time.perf_counter()
+    if playouts is None and time_limit_ms is None:
+        playouts = DEFAULT_MCTS_PLAYOUTS
+    n, k = board.n, board.k
+    grid = board.board
+    history = [(r * n + c, grid[r][c]) for r, c in board.moves_history]
+    tree = trees.get((n, k)) if trees is not None else None
+    if tree is None or tree.exploration != exploration or not tree.advance(history, ai_mark):
+        tree = MCTSTree(n, k, history, ai_mark, exploration)
+    if trees is not None:
+        trees[(n, k)] = tree
+    opponent_mark = PLAYER_O if ai_mark == PLAYER_X else PLAYER_X
+    start_nodes = stats.nodes
+
+    candidates = tree.candidate_moves(tree.bits[ai_mark], tree.bits[opponent_mark]) if board.get_state() == State.PLAYING else []
+    if len(candidates) <= 1:
+        # Partida terminada o un solo candidato (victoria, bloqueo o tablero vacío): no hace falta simular
+        stats.stop()
+        move = divmod(candidates[0], n) if candidates else None
+        return SearchResult(move, 0, 0, 0, (time.perf_counter() - start) * 1000, False)
+
+    rng = random.Random(seed)
+    futures = []
+    if workers > 1:
+        remaining_s = None if time_limit_ms is None else max(0.0, time_limit_ms / 1000 - (time.perf_counter() - start))
+        executor = _get_executor(workers - 1)
+        futures = [executor.submit(_mcts_worker, (n, k, history, ai_mark, playouts, remaining_s, exploration, rng.getrandbits(64)))
+                   for _ in range(workers - 1)]
+    deadline = None if time_limit_ms is None else start + time_limit_ms / 1000
+    tree.run(playouts, deadline, rng, stats, stop)
+    counts = tree.root_counts()
+    for future in futures:
+        worker_counts, worker_stats = future.result()
+        stats.merge(worker_stats)
+        for move, (visits, wins) in worker_counts.items():
+            total = counts.setdefault(move, [0, 0.0])
+            total[0] += visits
+            total[1] += wins
+
+    best_bit = max(counts, key=lambda move: (counts[move][0], counts[move][1]))
+    for bit, (visits, wins) in counts.items():
+        stats.root_move(divmod(bit, n), 2 * wins / visits - 1)
+    visits, wins = counts[best_bit]
+    stats.stop()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return SearchResult(divmod(best_bit, n), 2 * wins / visits - 1, tree.max_depth, stats.nodes - start_nodes, elapsed_ms, False)
+
+# --- Comparación de representaciones del tablero ---
+
+def perft(board, mark):
+    # Recorre el árbol completo de la partida desde la posición actual (como el minimax original,
+    # pero sin evaluar) y devuelve el número de nodos visitados. Mide solo el coste del tablero.
+    if board.get_state() != State.PLAYING:
+        return 1
+    next_mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+    nodes = 1
+    for move in board.get_possible_moves():
+        board.make_move(move, mark)
+        nodes += perft(board, next_mark)
+        board.undo()
+    return nodes
+
+def benchmark_backends(sizes=(3, 4), opening_moves=4):
+    # Compara los nodos por segundo de cada representación del tablero:
+    # - perft: árbol completo de 3x3 desde el tablero vacío (solo hacer/deshacer y estado).
+    # - alfa-beta: get_best_move con una tabla de transposición vacía desde una posición fija
+    #   de cada tamaño, tras 'opening_moves' movimientos en orden natural para tableros n > 3.
+    results = []
+    for name, board_class in BOARD_BACKENDS.items():
+        board = board_class(3)
+        start = time.perf_counter()
+        nodes = perft(board, PLAYER_X)
+        elapsed = time.perf_counter() - start
+        results.append((name, "perft 3x3", nodes, elapsed))
+
+        for n in sizes:
+            board = board_class(n)
+            mark = PLAYER_X
+            if n > 3:
+                for move in board.get_possible_moves()[:opening_moves]:
+                    board.make_move(move, mark)
+                    mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+            stats = SearchStats()
+            start = time.perf_counter()
+            get_best_move(board, mark, stats=stats)
+            elapsed = time.perf_counter() - start
+            results.append((name, f"alfa-beta {n}x{n}", stats.nodes, elapsed))
+
+    print(f"{'Tablero':<10} {'Prueba':<16} {'Nodos':>10} {'Segundos':>9} {'Nodos/s':>10}")
+    for name, test, nodes, elapsed in results:
+        print(f"{name:<10} {test:<16} {nodes:>10} {elapsed:>9.3f} {nodes / elapsed:>10.0f}")
+    return results
+
+# --- Partidas automáticas (self-play) ---
+
+# Opciones de get_best_move que se pueden dar en la descripción de un motor, con su conversión
+ENGINE_OPTIONS = {"depth": ("max_depth", int), "nodes": ("max_nodes", int),
+                  "time": ("time_limit_ms", float), "book": ("use_book", lambda value: value not in ("0", "no")),
+                  "mcts": ("use_mcts", lambda value: value not in ("0", "no")), "playouts": ("playouts", int)}
+
+def parse_engine(text):
+    # Convierte la descripción de un motor en un diccionario con las opciones de get_best_move.
+    # Formato: "random" (movimientos al azar) o una lista "clave=valor" separada por comas con
+    # las claves de ENGINE_OPTIONS, p. ej. "depth=3", "time=50,book=0", "mcts=1,playouts=2000".
+    # Vacía: búsqueda completa.
+    text = text.strip()
+    if text == "random":
+        return {"random": True}
+    engine = {}
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        if key not in ENGINE_OPTIONS or not value:
+            raise ValueError(f"Opción de motor desconocida: {item}. Usa random o {', '.join(ENGINE_OPTIONS)}.")
+        name, convert = ENGINE_OPTIONS[key]
+        engine[name] = convert(value)
+    return engine
+
+_self_play_boards = {} # Tablero de cada motor y configuración en cada proceso, para no crearlo en cada partida
+
+def play_self_game(task):
+    # Juega una partida entre dos motores (descritos como en parse_engine) sin intervención humana.
+    # Los primeros 'opening_moves' movimientos son aleatorios (con la semilla de la partida) para
+    # que partidas entre motores deterministas no sean todas iguales. El motor A juega con X en
+    # las partidas pares y con O en las impares. Devuelve un diccionario con el resultado,
+    # los movimientos y la duración de cada movimiento de cada motor.
+    # Cada motor busca en su propio tablero, con su propia tabla de transposición, que se vacía al
+    # empezar cada partida: así un motor no aprovecha lo que buscó el otro (p. ej. a más
+    # profundidad) ni lo de otras partidas, y la partida depende solo de la semilla, no de cuántos
+    # procesos se usen ni de qué partidas jugó antes cada uno.
+    game, n, k, backend, engine_a, engine_b, opening_moves, seed = task
+    boards = {}
+    for name, engine in (("A", engine_a), ("B", engine_b)):
+        config = (n, k, backend, name, repr(engine))
+        board = _self_play_boards.get(config)
+        if board is None:
+            board = _self_play_boards[config] = BOARD_BACKENDS[backend](n, k=k)
+        while board.moves_history:
+            board.undo()
+        board.tt.clear()
+        boards[name] = board
+    board = boards["A"] # Tablero de referencia de la partida; el de B recibe los mismos movimientos
+    rng = random.Random(seed * 1000003 + game)
+    engines = {PLAYER_X: ("A", engine_a), PLAYER_O: ("B", engine_b)} if game % 2 == 0 else \
+              {PLAYER_X: ("B", engine_b), PLAYER_O: ("A", engine_a)}
+    latencies = {"A": [], "B": []}
+    mark = PLAYER_X
+    while board.get_state() == State.PLAYING:
+        name, engine = engines[mark]
+        if len(board.moves_history) < opening_moves or engine.get("random"):
+            move = rng.choice(board.get_possible_moves())
+        else:
+            start = time.perf_counter()
+            move = get_best_move(boards[name], mark, **engine)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+        for each in boards.values():
+            each.make_move(move, mark)
+        mark = PLAYER_O if mark == PLAYER_X else PLAYER_X
+    winner = board.get_winner()
+    return {"game": game, "x": engines[PLAYER_X][0], "winner": engines[winner][0] if winner else None,
+            "winner_mark": winner, "moves": [list(move) for move in board.moves_history], "latency_ms": latencies}
+
+def percentile(values, fraction):
+    # Percentil por el método del rango más cercano; 0 si no hay valores
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def run_self_play(games, n=3, k=None, engine_a=None, engine_b=None, workers=1, output_path=None,
+                  opening_moves=1, seed=0, backend="bitboard", chunk_size=64):
+    # Juega 'games' partidas entre dos motores (diccionarios de parse_engine; por defecto búsqueda
+    # completa) repartidas entre 'workers' procesos. Si se indica output_path, cada partida se
+    # escribe en ese fichero como una línea JSON en cuanto termina. Devuelve un resumen con el
+    # porcentaje de victorias de cada motor y de empates, y los percentiles de la duración de sus
+    # movimientos (sin contar los de apertura aleatorios).
+    k = _check_size(n, k)
+    engine_a = {} if engine_a is None else engine_a
+    engine_b = {} if engine_b is None else engine_b
+    tasks = ((game, n, k, backend, engine_a, engine_b, opening_moves, seed) for game in range(games))
+    start = time.perf_counter() # Antes de repartir las partidas: map ya las envía a los procesos
+    if workers > 1:
+        results = _get_executor(workers).map(play_self_game, tasks, chunksize=chunk_size)
+    else:
+        results = map(play_self_game, tasks)
+    counts = {"A": 0, "B": 0, None: 0}
+    x_wins = 0
+    latencies = {"A": [], "B": []}
+    output = open(output_path, "w", encoding="utf-8") if output_path else None
+    try:
+        for result in results:
+            counts[result["winner"]] += 1
+            x_wins += result["winner_mark"] == PLAYER_X
+            for name in latencies:
+                latencies[name].extend(result["latency_ms"][name])
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+    elapsed = time.perf_counter() - start
+    summary = {"games": games, "n": n, "k": k, "seconds": elapsed, "games_per_hour": games / elapsed * 3600 if elapsed > 0 else 0,
+               "a_wins": counts["A"] / games, "b_wins": counts["B"] / games, "draws": counts[None] / games,
+               "x_wins": x_wins / games}
+    for name in latencies:
+        for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0)):
+            summary[f"{name.lower()}_{label}_ms"] = percentile(latencies[name], fraction)
+    return summary
+
+def print_self_play_summary(summary, engine_a, engine_b):
+    print(f"{summary['games']} partidas {summary['n']}x{summary['n']} ({summary['k']} en raya) en {summary['seconds']:.1f} s, "
+          f"{summary['games_per_hour']:.0f} partidas/hora")
+    print(f"A ({engine_a or 'completo'}): {summary['a_wins']:.1%} victorias   B ({engine_b or 'completo'}): {summary['b_wins']:.1%} victorias   "
+          f"Empates: {summary['draws']:.1%}   (X gana el {summary['x_wins']:.1%})")
+    for name in ("a", "b"):
+        print(f"Movimientos de {name.upper()}: p50 {summary[f'{name}_p50_ms']:.2f} ms, p90 {summary[f'{name}_p90_ms']:.2f} ms, "
+              f"p99 {summary[f'{name}_p99_ms']:.2f} ms, máximo {summary[f'{name}_max_ms']:.2f} ms")
+
+# --- Pensar durante el turno del humano ---
+
+class Ponderer:
+    # Piensa la respuesta de la IA mientras el humano elige su movimiento (pondering). En un hilo
+    # aparte, sobre una copia del tablero que comparte la tabla de transposición de la partida,
+    # busca la respuesta de la IA a cada movimiento posible del humano, empezando por los más
+    # probables (en el orden de order_moves) y con el mismo presupuesto que la búsqueda normal.
+    # Si el humano juega uno ya pensado, la IA responde al instante con ese resultado; si no,
+    # la búsqueda normal aprovecha lo que quedó en la tabla de transposición.
+    # El hilo y la partida nunca usan la tabla a la vez: stop() espera a que el hilo termine.
+    def __init__(self, board, ai_mark, think):
+        # think: función (tablero, marca, stats, stop) que busca y devuelve un SearchResult;
+        #        stop es un threading.Event que debe interrumpir la búsqueda en cuanto se active
+        self.think = think
+        self.ai_mark = ai_mark
+        self.human_mark = PLAYER_O if ai_mark == PLAYER_X else PLAYER_X
+        self.board = type(board)(board.n, tt_max_entries=2, k=board.k) # Su tabla se sustituye por la de la partida
+        self.board.tt = board.tt
+        grid = board.board
+        for move in board.moves_history:
+            self.board.make_move(move, grid[move[0]][move[1]])
+        self.results = {}          # Respuesta ya pensada a cada movimiento del humano
+        self.stats = SearchStats() # Contadores de lo pensado, aparte de los de la partida
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        board = self.board
+        for move in order_moves(board, board.get_possible_moves(), self.human_mark, self.ai_mark):
+            if self.stop_event.is_set():
+                return
+            board.make_move(move, self.human_mark)
+            if board.get_state() == State.PLAYING:
+                result = self.think(board, self.ai_mark, self.stats, self.stop_event)
+                if not self.stop_event.is_set(): # Si se interrumpió, el resultado está a medias
+                    self.results[move] = result
+            board.undo()
+
+    def stop(self, move):
+        # Detiene el hilo y devuelve la respuesta ya pensada al movimiento 'move' del humano, o None
+        self.stop_event.set()
+        self.thread.join()
+        return self.results.get(move)
+
+# --- Precarga (--warm) ---
+
+DEFAULT_WARM_SIZES = ((3, 3), (4, 4)) # Tamaños (n, k) cuyas tablas prepara warm_up por defecto
+
+def warm_up(sizes=DEFAULT_WARM_SIZES):
+    # Paga de una vez lo que el arranque normal deja para el primer uso: importa NumPy (si está
+    # instalado), multiprocessing y sqlite3, abre el libro de aperturas y genera las tablas Zobrist,
+    # de simetrías y de MCTS de cada tamaño (n, k). Pensado para procesos de larga duración (el
+    # servidor, --self-play): si se llama antes de crear los procesos trabajadores, estos lo heredan.
+    # Devuelve los segundos que ha tardado.
+    start = time.perf_counter()
+    if HAVE_NUMPY:
+        _require_numpy()
+    for name in ("multiprocessing", "concurrent.futures", "sqlite3"): # Los que se importan al usarlos
+        importlib.import_module(name)
+    get_opening_book()
+    for n, k in sizes:
+        get_zobrist_table(n)
+        get_symmetric_zobrist(n)
+        _get_mcts_tables(n, k)
+    return time.perf_counter() - start
+
 # --- Lógica Principal del Juego ---
-def play_game():
+
+AI_TIME_LIMIT_MS = 2000 # Tiempo máximo de cada movimiento de la IA, en milisegundos
+
+def play_game(backend="list", trace_path=None, cache_path=None, use_mcts=False, workers=1, ponder=True):
+    # backend: representación del tablero a usar (una de las claves de BOARD_BACKENDS)
+    # trace_path: si se indica, tras cada movimiento de la IA se escriben ahí en JSON los
+    #             contadores acumulados de sus búsquedas y cada iteración y movimiento de la raíz
+    # cache_path: si se indica, base de datos de PositionCache con las posiciones ya resueltas
+    # use_mcts: la IA usa la búsqueda Monte Carlo (mcts_best_move) con 'workers' procesos
+    # ponder: la IA piensa sus respuestas mientras el humano elige su movimiento (ver Ponderer)
     board_size = 0
     while True:
         try:
@@ -199,17 +2234,48 @@ def play_game():
         except ValueError:
             print("Entrada inválida. Por favor, introduce un número entero.")
 
-    game_board = TicTacBoard(n=board_size)
+    win_length = board_size
+    while True:
+        try:
+            win_length_input = input(f"¿Cuántas en raya hacen falta para ganar? (2-{board_size}, Enter para {board_size}): ")
+            if win_length_input.strip():
+                win_length = int(win_length_input)
+            if 2 <= win_length <= board_size:
+                break
+            else:
+                print(f"Debe estar entre 2 y {board_size}.")
+        except ValueError:
+            print("Entrada inválida. Por favor, introduce un número entero.")
+
+    game_board = BOARD_BACKENDS[backend](n=board_size, k=win_length)
+    stats = SearchStats(trace=trace_path is not None) # Contadores de todas las búsquedas de la partida
+    cache = PositionCache(cache_path) if cache_path else None
     human_player = PLAYER_X
     ai_player = PLAYER_O
     current_player = human_player # El humano empieza
+    ponderer = None # Pensamiento en marcha durante el turno del humano
+    pondered = None # Respuesta ya pensada al último movimiento del humano
+    mcts_trees = {} # Árbol de MCTS de la partida, que se reutiliza de un turno al siguiente
+
+    def think(board, mark, search_stats, stop=None):
+        # Búsqueda de la IA con el tiempo de cada movimiento: con límite de tiempo la IA siempre
+        # responde, aunque en tableros grandes no pueda buscar hasta el final de la partida.
+        # Al pensar en otro hilo (con stop) no se usan la caché, que es de este hilo, ni el árbol
+        # de MCTS de la partida ni otros procesos.
+        if use_mcts:
+            return mcts_best_move(board, mark, time_limit_ms=AI_TIME_LIMIT_MS, workers=workers if stop is None else 1,
+                                  stats=search_stats, trees=mcts_trees if stop is None else None, stop=stop)
+        return search_best_move(board, mark, time_limit_ms=AI_TIME_LIMIT_MS, stats=search_stats,
+                                cache=cache if stop is None else None, stop=stop)
 
-    print(f"\nTres en Raya (Tic Tac Toe) {board_size}x{board_size} con Minimax")
+    print(f"\nTres en Raya (Tic Tac Toe) {board_size}x{board_size}, {win_length} en raya, con Minimax")
     game_board.print_board()
 
     while game_board.get_state() == State.PLAYING:
         if current_player == human_player:
             print(f"\nTurno del Humano ({human_player})")
+            if ponder and ponderer is None:
+                ponderer = Ponderer(game_board, ai_player, think).start()
             try:
                 row_input = int(input(f"Elige fila (1-{board_size}): "))
                 col_input = int(input(f"Elige columna (1-{board_size}): "))
@@ -217,6 +2283,9 @@ def play_game():
                 move = (row_input - 1, col_input - 1) # Convertir a coordenadas 0-indexadas
 
                 if 0 <= move[0] < board_size and 0 <= move[1] < board_size and move in game_board.get_possible_moves():
+                    if ponderer is not None:
+                        pondered = ponderer.stop(move)
+                        ponderer = None
                     game_board.make_move(move, human_player)
                     current_player = ai_player
                 else:
@@ -225,8 +2294,20 @@ def play_game():
                 print("Entrada inválida. Ingresa números.")
         else: # Turno de la IA
             print(f"\nTurno de la IA ({ai_player})")
-            print("Calculando movimiento...") # Añadido para feedback en tableros grandes
-            move = get_best_move(game_board, ai_player)
+            if pondered is not None:
+                result = pondered
+                # La respuesta es inmediata: las cifras de la búsqueda son del tiempo del humano
+                print(f"Respuesta pensada durante el turno del humano (0 ms ahora; al pensarla: {result})")
+                if cache is not None and result.completed:
+                    cache.store(game_board, ai_player, result.move, result.score)
+            else:
+                print("Calculando movimiento...") # Añadido para feedback en tableros grandes
+                result = think(game_board, ai_player, stats)
+                print(f"Búsqueda: {result}")
+            pondered = None
+            move = result.move
+            if trace_path is not None:
+                stats.dump_json(trace_path)
             if move:
                 print(f"Fila elegida por IA: {move[0] + 1}, Columna elegida por IA: {move[1] + 1}")
                 game_board.make_move(move, ai_player)
@@ -250,6 +2331,65 @@ def play_game():
                 else:
                     print(f"\n¡La IA ({winner}) ha ganado!")
             break
+    if ponderer is not None:
+        ponderer.stop(None)
+    if cache is not None:
+        cache.close()
+
+def main(argv=None):
+    # Línea de comandos; argv como en sys.argv[1:] (por defecto, el de este proceso)
+    parser = argparse.ArgumentParser(description="Tres en Raya n x n con Minimax")
+    parser.add_argument("--backend", choices=sorted(BOARD_BACKENDS), default="list",
+                        help="representación del tablero")
+    parser.add_argument("--bench-backends", action="store_true",
+                        help="compara los nodos por segundo de las representaciones del tablero y termina")
+    parser.add_argument("--bench-parallel", action="store_true",
+                        help="mide la búsqueda en paralelo en 4x4 con 1, 2, 4 y 8 procesos y termina")
+    parser.add_argument("--build-book", nargs="?", const=OPENING_BOOK_PATH, metavar="RUTA",
+                        help="resuelve las aperturas de 4x4 y escribe el libro (por defecto junto al script)")
+    parser.add_argument("--book-plies", type=int, default=DEFAULT_BOOK_PLIES,
+                        help="movimientos desde el tablero vacío que cubre el libro")
+    parser.add_argument("--self-play", type=int, metavar="PARTIDAS",
+                        help="juega PARTIDAS partidas IA contra IA sin intervención humana y termina")
+    parser.add_argument("--size", type=int, default=3, help="tamaño del tablero en --self-play")
+    parser.add_argument("--win-length", type=int, help="marcas en raya para ganar en --self-play (por defecto el tamaño)")
+    parser.add_argument("--engine-a", default="", metavar="MOTOR",
+                        help='motor A en --self-play: "random" o opciones como "depth=3,time=50,book=0" (vacío: búsqueda completa)')
+    parser.add_argument("--engine-b", default="", metavar="MOTOR", help="motor B en --self-play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="procesos en --self-play y con --mcts")
+    parser.add_argument("--no-ponder", dest="ponder", action="store_false",
+                        help="la IA no piensa sus respuestas mientras el humano elige su movimiento")
+    parser.add_argument("--mcts", action="store_true",
+                        help="la IA usa búsqueda Monte Carlo (MCTS) en lugar de minimax, para tableros grandes")
+    parser.add_argument("--opening-moves", type=int, default=1, help="movimientos de apertura aleatorios en --self-play")
+    parser.add_argument("--seed", type=int, default=0, help="semilla de las aperturas aleatorias en --self-play")
+    parser.add_argument("--output", metavar="RUTA", help="escribe cada partida de --self-play en RUTA (JSONL)")
+    parser.add_argument("--cache", metavar="RUTA",
+                        help="base de datos SQLite donde se guardan y se reutilizan las posiciones resueltas")
+    parser.add_argument("--trace", metavar="RUTA",
+                        help="escribe en RUTA (JSON) las estadísticas de las búsquedas de la IA")
+    parser.add_argument("--warm", action="store_true",
+                        help="precarga módulos, libro de aperturas y tablas antes de empezar (ver warm_up)")
+    args = parser.parse_args(argv)
+    if args.warm:
+        sizes = DEFAULT_WARM_SIZES
+        if args.self_play:
+            sizes += ((args.size, args.win_length or args.size),)
+        print(f"Precarga completada en {warm_up(sizes) * 1000:.0f} ms")
+    if args.bench_backends:
+        benchmark_backends()
+    elif args.bench_parallel:
+        benchmark_parallel()
+    elif args.self_play:
+        summary = run_self_play(args.self_play, args.size, args.win_length, parse_engine(args.engine_a), parse_engine(args.engine_b),
+                                args.workers, args.output, args.opening_moves, args.seed)
+        print_self_play_summary(summary, args.engine_a, args.engine_b)
+    elif args.build_book:
+        start = time.perf_counter()
+        records = build_opening_book(plies=args.book_plies, path=args.build_book)
+        print(f"Libro escrito en {args.build_book}: {records} posiciones en {time.perf_counter() - start:.1f} s")
+    else:
+        play_game(args.backend, args.trace, args.cache, args.mcts, args.workers, args.ponder)
 
 if __name__ == "__main__":
-    play_game()
+    main()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+from ticTacToe_loader import GAMES, load_game
+
+# Lanzador de los dos juegos. Python no guarda el bytecode del script que se ejecuta directamente,
+# así que "python ticTacToe-n-minimax.py" vuelve a compilar todo el módulo en cada arranque.
+# Cargado desde aquí como módulo, el bytecode queda en __pycache__ y los siguientes arranques
+# se lo ahorran. El resto de argumentos se pasan tal cual a la línea de comandos del juego:
+#   python ticTacToe-run.py nxn --self-play 100 --size 4
+#   python ticTacToe-run.py 3x3 --warm
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in GAMES:
+        sys.exit(f"Uso: python {os.path.basename(sys.argv[0])} {{{','.join(GAMES)}}} [opciones del juego]")
+    load_game(sys.argv[1]).main(sys.argv[2:])
@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from ticTacToe_loader import load_game
+
+# Servidor de partidas de Tres en Raya n x n contra la IA, con asyncio.
+# Cada conexión TCP es una sesión con su propia partida. El protocolo es de una línea JSON por
+# petición y por respuesta, así que se puede probar con cualquier cliente de texto, p. ej.:
+#   python ticTacToe-server.py --port 8765
+#   nc localhost 8765
+#   {"op": "new", "n": 4, "ai": "O"}
+#   {"op": "move", "row": 0, "col": 0}
+# Peticiones:
+#   {"op": "new", "n": 3, "k": 3, "ai": "O"} -> empieza una partida nueva (X siempre empieza;
+#                                               si la IA es X, mueve ya en la respuesta)
+#   {"op": "move", "row": r, "col": c}       -> movimiento del jugador (0-indexado) y respuesta de la IA
+#   {"op": "state"}                          -> estado actual de la partida
+#   {"op": "retry"}                          -> vuelve a pedir el movimiento de la IA si falló su búsqueda
+# Respuestas: {"ok": true, "board": [...], "state": ..., "winner": ..., "to_move": "X"|"O"|null,
+#              "ai_move": [r, c]} o {"ok": false, "error": "..."}
+# Si la búsqueda de la IA falla (servidor ocupado o sin respuesta a tiempo), el turno sigue siendo
+# de la IA: se rechazan los movimientos del jugador hasta que un "retry" obtenga el de la IA.
+# Las búsquedas se hacen en un grupo limitado de procesos, para que una búsqueda lenta no bloquee
+# al resto de sesiones, y cada una tiene un tiempo máximo (se devuelve el mejor movimiento
+# encontrado al agotarlo). Si hay demasiadas búsquedas esperando, las nuevas se rechazan con
+# "servidor ocupado". Si un cliente se desconecta mientras se busca su movimiento, la búsqueda
+# se cancela si aún no había empezado; si ya estaba en marcha, termina en su tiempo máximo y
+# el resultado se descarta.
+
+DEFAULT_PORT = 8765
+DEFAULT_MOVE_TIME_MS = 1000 # Tiempo máximo de búsqueda de cada movimiento de la IA
+DEADLINE_GRACE_S = 2.0      # Margen sobre el tiempo de búsqueda antes de dar la búsqueda por perdida
+DEFAULT_MAX_WAITING = 64    # Búsquedas que pueden esperar a un proceso libre antes de rechazar nuevas
+MAX_BOARD_SIZE = 15
+
+engine = load_game("nxn")
+
+_worker_boards = {} # Tablero de cada tamaño en cada proceso, para conservar su tabla de transposición
+_worker_caches = {} # Caché persistente abierta en cada proceso, por ruta
+
+def _search(task):
+    # Se ejecuta en un proceso del grupo: reconstruye la posición a partir de los movimientos
+    # y devuelve el movimiento de la IA
+    n, k, history, ai_mark, time_limit_ms, cache_path = task
+    board = _worker_boards.get((n, k))
+    if board is None:
+        board = _worker_boards[(n, k)] = engine.BitTicTacBoard(n, k=k)
+    while board.moves_history:
+        board.undo()
+    for move, mark in history:
+        board.make_move(tuple(move), mark)
+    cache = None
+    if cache_path:
+        cache = _worker_caches.get(cache_path)
+        if cache is None:
+            # Se escribe cada resultado en cuanto se obtiene, para que lo vean los demás procesos
+            cache = _worker_caches[cache_path] = engine.PositionCache(cache_path, batch_size=1)
+    return engine.search_best_move(board, ai_mark, time_limit_ms=time_limit_ms, cache=cache).move
+
+def int_field(request, name, default=None):
+    # Campo entero de una petición; ValueError (que se responde como error) si falta o no es un entero
+    value = request.get(name, default)
+    if value is None:
+        raise ValueError(f'Falta el campo "{name}".')
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f'El campo "{name}" debe ser un número entero.')
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'El campo "{name}" debe ser un número entero.') from None
+
+class ServerBusy(Exception):
+    pass
+
+class SearchPool:
+    # Grupo de procesos para las búsquedas, con un límite de búsquedas en espera (contrapresión)
+    def __init__(self, workers, max_waiting=DEFAULT_MAX_WAITING, cache_path=None):
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork") if "fork" in methods else None
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        self.slots = asyncio.Semaphore(workers) # Búsquedas en marcha a la vez
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self.cache_path = cache_path # Caché persistente (PositionCache) compartida por los procesos
+
+    async def search(self, board, ai_mark, time_limit_ms):
+        if self.waiting >= self.max_waiting:
+            raise ServerBusy()
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            history = [(move, board.board[move[0]][move[1]]) for move in board.moves_history]
+            future = asyncio.get_running_loop().run_in_executor(self.executor, _search, (board.n, board.k, history, ai_mark, time_limit_ms, self.cache_path))
+            return await asyncio.wait_for(future, time_limit_ms / 1000 + DEADLINE_GRACE_S)
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class GameSession:
+    # Partida de una conexión
+    def __init__(self, pool, move_time_ms):
+        self.pool = pool
+        self.move_time_ms = move_time_ms
+        self.board = None
+        self.ai_mark = engine.PLAYER_O
+        self.to_move = None # Marca a la que le toca mover (None si la partida ha terminado)
+
+    def describe(self, **extra):
+        board = self.board
+        to_move = self.to_move if board.get_state() == engine.State.PLAYING else None
+        return dict(ok=True, board=["".join(row) for row in board.board], state=board.get_state(),
+                    winner=board.get_winner(), to_move=to_move, **extra)
+
+    async def handle(self, request):
+        # Atiende una petición y devuelve la respuesta
+        op = request.get("op")
+        if op == "new":
+            n = int_field(request, "n", 3)
+            k = int_field(request, "k", n)
+            if not 3 <= n <= MAX_BOARD_SIZE:
+                raise ValueError(f"El tamaño del tablero debe estar entre 3 y {MAX_BOARD_SIZE}.")
+            self.ai_mark = engine.PLAYER_X if request.get("ai") == engine.PLAYER_X else engine.PLAYER_O
+            # La sesión no busca (lo hacen los procesos), así que su tabla de transposición es mínima
+            self.board = engine.TicTacBoard(n, k=k, tt_max_entries=2)
+            self.to_move = engine.PLAYER_X
+            if self.ai_mark == engine.PLAYER_X:
+                return await self.ai_turn()
+            return self.describe()
+        if self.board is None:
+            raise ValueError('No hay partida: envía {"op": "new"} primero.')
+        if op == "state":
+            return self.describe()
+        if op in ("move", "retry"):
+            if self.board.get_state() != engine.State.PLAYING:
+                raise ValueError("La partida ya ha terminado.")
+            if op == "retry":
+                if self.to_move != self.ai_mark:
+                    raise ValueError("No hay ningún movimiento de la IA pendiente.")
+                return await self.ai_turn()
+            if self.to_move == self.ai_mark: # Falló la búsqueda anterior de la IA
+                raise ValueError('Le toca mover a la IA: envía {"op": "retry"}.')
+            move = (int_field(request, "row"), int_field(request, "col"))
+            if move not in self.board.get_possible_moves():
+                raise ValueError(f"Movimiento inválido: {list(move)}.")
+            self.board.make_move(move, self.to_move)
+            self.to_move = self.ai_mark
+            if self.board.get_state() != engine.State.PLAYING:
+                return self.describe()
+            return await self.ai_turn()
+        raise ValueError(f"Operación desconocida: {op}.")
+
+    async def ai_turn(self):
+        # Si la búsqueda falla, to_move sigue siendo la IA y el tablero no cambia
+        move = await self.pool.search(self.board, self.ai_mark, self.move_time_ms)
+        self.board.make_move(move, self.ai_mark)
+        self.to_move = engine.PLAYER_O if self.ai_mark == engine.PLAYER_X else engine.PLAYER_X
+        return self.describe(ai_move=list(move))
+
+_session_ids = itertools.count(1)
+
+async def serve_client(reader, writer, pool, move_time_ms):
+    session_id = next(_session_ids)
+    session = GameSession(pool, move_time_ms)
+    read_task = None # Lectura de la siguiente línea; sigue en marcha mientras se atiende la anterior
+    try:
+        while True:
+            if read_task is None:
+                read_task = asyncio.ensure_future(reader.readline())
+            line = await read_task
+            read_task = None
+            if not line:
+                break # El cliente cerró la conexión
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Cada petición debe ser un objeto JSON.")
+            except ValueError as error:
+                response = {"ok": False, "error": f"Petición inválida: {error}"}
+            else:
+                # Mientras se atiende la petición se sigue leyendo, para enterarse de si el
+                # cliente se desconecta y cancelar la búsqueda
+                handler = asyncio.ensure_future(session.handle(request))
+                read_task = asyncio.ensure_future(reader.readline())
+                await asyncio.wait((handler, read_task), return_when=asyncio.FIRST_COMPLETED)
+                if not handler.done() and read_task.done() and (read_task.exception() or not read_task.result()):
+                    handler.cancel()
+                    print(f"Sesión {session_id}: el cliente se desconectó, búsqueda cancelada")
+                    break
+                try:
+                    response = await handler
+                except ServerBusy:
+                    response = {"ok": False, "error": "servidor ocupado"}
+                except asyncio.TimeoutError:
+                    response = {"ok": False, "error": "la IA no respondió a tiempo"}
+                except (KeyError, ValueError) as error:
+                    response = {"ok": False, "error": str(error)}
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        if read_task is not None and not read_task.done():
+            read_task.cancel()
+        writer.close()
+        print(f"Sesión {session_id} terminada")
+
+async def run_server(host="127.0.0.1", port=DEFAULT_PORT, workers=None, move_time_ms=DEFAULT_MOVE_TIME_MS,
+                     max_waiting=DEFAULT_MAX_WAITING, cache_path=None):
+    pool = SearchPool(workers or multiprocessing.cpu_count(), max_waiting, cache_path)
+    server = await asyncio.start_server(lambda reader, writer: serve_client(reader, writer, pool, move_time_ms), host, port)
+    print(f"Servidor escuchando en {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de partidas de Tres en Raya n x n contra la IA")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, help="procesos de búsqueda (por defecto uno por CPU)")
+    parser.add_argument("--move-time", type=int, default=DEFAULT_MOVE_TIME_MS,
+                        help="tiempo máximo de cada movimiento de la IA, en milisegundos")
+    parser.add_argument("--max-waiting", type=int, default=DEFAULT_MAX_WAITING,
+                        help="búsquedas en espera a partir de las cuales se rechazan las nuevas")
+    parser.add_argument("--cache", metavar="RUTA",
+                        help="base de datos SQLite de posiciones resueltas, compartida por los procesos de búsqueda")
+    parser.add_argument("--warm", action="store_true",
+                        help="precarga el motor (módulos, libro de aperturas y tablas) antes de crear los procesos, "
+                             "que lo heredan ya cargado")
+    args = parser.parse_args()
+    if args.warm:
+        print(f"Precarga completada en {engine.warm_up() * 1000:.0f} ms")
+    try:
+        asyncio.run(run_server(args.host, args.port, args.workers, args.move_time, args.max_waiting, args.cache))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,25 @@
+import importlib.util
+import os
+import sys
+
+# Carga de los dos juegos como módulos, compartida por el lanzador (ticTacToe-run.py), el banco de
+# pruebas y el servidor. Los nombres de los scripts no son identificadores válidos de Python, así
+# que no se pueden importar con import; este fichero sí, por eso su nombre es distinto.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAMES = {"3x3": ("ticTacToe_minimax", "ticTacToe-minimax.py"),
+         "nxn": ("ticTacToe_n_minimax", "ticTacToe-n-minimax.py")}
+
+def load_module(name, filename):
+    # Carga uno de los scripts como módulo. Se registra en sys.modules para que la búsqueda en
+    # paralelo pueda enviar sus funciones a los procesos, y su bytecode queda en __pycache__.
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+def load_game(game):
+    # Módulo del juego "3x3" o "nxn"
+    return load_module(*GAMES[game])